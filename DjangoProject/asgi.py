@@ -2,6 +2,8 @@
 ASGI config for DjangoProject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The /events/ server-sent events stream is only served through this entry point;
+under WSGI it answers 204 and dashboards fall back to manual refresh.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
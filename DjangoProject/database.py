@@ -0,0 +1,88 @@
+"""
+数据库配置解析
+
+将 DATABASE_URL 风格的连接串解析为 Django 的 DATABASES 配置项，支持:
+    - sqlite:///data/db.sqlite3（相对于项目目录）或 sqlite:////绝对路径
+    - postgres://用户:密码@主机:端口/库名?sslmode=require（也可写 postgresql:// 或 pgsql://）
+
+查询参数中的 pool=pgbouncer 表示经由 PgBouncer（事务池模式）连接，
+此时关闭服务端游标；其余查询参数原样放入 OPTIONS。
+"""
+
+import os
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+POSTGRES_SCHEMES = ('postgres', 'postgresql', 'pgsql')
+
+# SQLite 并发配置：WAL 允许读写并发，NORMAL 在 WAL 下仍可保证一致性，
+# IMMEDIATE 事务让写入冲突按 busy_timeout 排队，而不是直接报 "database is locked"
+SQLITE_WAL_OPTIONS = {
+    'pragmas': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+    },
+    'transaction_mode': 'IMMEDIATE',
+}
+
+
+def database_from_url(url, base_dir, conn_max_age=60, conn_health_checks=True, sqlite_wal=True):
+    """
+    解析数据库连接串
+
+    参数:
+        url (str): DATABASE_URL 风格的连接串
+        base_dir (Path or str): 解析SQLite相对路径的基准目录
+        conn_max_age (int): 持久连接的最长保持秒数，0 表示每个请求结束后关闭
+        conn_health_checks (bool): 复用持久连接前是否检查连接可用
+        sqlite_wal (bool): SQLite 是否使用 SQLITE_WAL_OPTIONS 并发配置
+
+    返回:
+        dict: DATABASES 中的一项配置
+
+    异常:
+        ValueError: 不支持的数据库类型
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    options = dict(parse_qsl(parts.query))
+    config = {
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': conn_health_checks,
+    }
+
+    if scheme == 'sqlite':
+        # sqlite:///相对路径 与 sqlite:////绝对路径
+        path = unquote(parts.path)
+        if path.startswith('//'):
+            path = path[1:]
+        elif path.startswith('/'):
+            path = os.path.join(base_dir, path[1:])
+        config.update({
+            'ENGINE': 'demo.db.sqlite3',
+            'NAME': path or ':memory:',
+            'OPTIONS': {
+                **({'pragmas': dict(SQLITE_WAL_OPTIONS['pragmas']),
+                    'transaction_mode': SQLITE_WAL_OPTIONS['transaction_mode']} if sqlite_wal else {}),
+                **options,
+            },
+        })
+        return config
+
+    if scheme in POSTGRES_SCHEMES:
+        pgbouncer = options.pop('pool', '') == 'pgbouncer'
+        config.update({
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': unquote(parts.path.lstrip('/')),
+            'USER': unquote(parts.username or ''),
+            'PASSWORD': unquote(parts.password or ''),
+            'HOST': parts.hostname or '',
+            'PORT': str(parts.port or ''),
+            'OPTIONS': options,
+        })
+        if pgbouncer:
+            # 事务池模式下同一连接可能跨事务切换，服务端游标无法保留
+            config['DISABLE_SERVER_SIDE_CURSORS'] = True
+        return config
+
+    raise ValueError(f'不支持的数据库类型: {scheme or url}')
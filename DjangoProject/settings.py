@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from .database import database_from_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,12 +46,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'demo.middleware.RequestMetricsMiddleware',
     # 'whitenoise.middleware.WhiteNoiseMiddleware',  # 生产环境启用
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'demo.middleware.RequestLogBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,8 +64,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # 显式使用缓存加载器：模板只编译一次，各请求复用编译结果；
+            # DEBUG 下开发服务器在模板文件修改后会自动清空该缓存
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -77,13 +88,66 @@ WSGI_APPLICATION = 'DjangoProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# 通过 DATABASE_URL 选择数据库，默认使用项目目录下的 SQLite（WAL 模式）
+# PostgreSQL 示例: postgres://user:password@db:5432/demo，经由 PgBouncer 时追加 ?pool=pgbouncer
+# DB_CONN_MAX_AGE 为持久连接保持秒数（0 表示每个请求后关闭），SQLITE_WAL=False 时使用SQLite默认的日志与事务模式
+_DATABASE_OPTIONS = {
+    'conn_max_age': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+    'conn_health_checks': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 't'),
+    'sqlite_wal': os.environ.get('SQLITE_WAL', 'True').lower() in ('true', '1', 't'),
+}
 DATABASES = {
+    'default': database_from_url(
+        os.environ.get('DATABASE_URL', 'sqlite:///data/db.sqlite3'), BASE_DIR, **_DATABASE_OPTIONS
+    )
+}
+
+# 只读副本：DATABASE_REPLICA_URLS 为逗号分隔的连接串，依次注册为 replica_0、replica_1 ...
+# 本地可用两个SQLite文件测试，如 DATABASE_REPLICA_URLS=sqlite:///data/replica.sqlite3（需先复制主库文件）
+_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+DATABASES.update({
+    f'replica_{index}': {**database_from_url(url, BASE_DIR, **_DATABASE_OPTIONS), 'TEST': {'MIRROR': 'default'}}
+    for index, url in enumerate(_REPLICA_URLS)
+})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['demo.routers.ReplicaRouter']
+# 写入后该客户端的读请求固定到主库的秒数（应大于副本复制延迟）
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 默认使用本地内存缓存，可通过环境变量切换到文件缓存或Redis等后端
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'data', 'db.sqlite3'),
-    }
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'django-hub'),
+    },
+    # 会话缓存单独配置，便于使用Redis/Memcached等多进程共享的后端
+    'sessions': {
+        'BACKEND': os.environ.get('SESSION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', 'django-hub-sessions'),
+    },
 }
 
+# 会话存储：db（每个请求读取 django_session）、cached_db（默认，读缓存、写穿透到数据库）、
+# cache（只存缓存，缓存清空即全部登出）或 signed_cookies（存于签名Cookie，不访问服务端存储）
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# 仪表盘统计缓存（缓存别名与过期时间，单位秒）
+DASHBOARD_STATS_CACHE = 'default'
+DASHBOARD_STATS_TIMEOUT = int(os.environ.get('DASHBOARD_STATS_TIMEOUT', 300))
+# 仪表盘首屏渲染的用户数，其余由前端滚动时分页加载
+DASHBOARD_PAGE_SIZE = int(os.environ.get('DASHBOARD_PAGE_SIZE', 50))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -104,6 +168,39 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# 密码哈希方案：pbkdf2（默认）、scrypt 或 argon2（需要安装 argon2-cffi）
+# 其他方案的哈希仍可校验，并在用户下次登录时升级为首选方案
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+_PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'demo.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'demo.hashers.TunedScryptPasswordHasher',
+    'argon2': 'demo.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    path for name, path in _PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# 哈希成本参数，未设置时使用Django默认值，可用 python manage.py benchmark_hashers 校准
+def _env_int(name):
+    return int(os.environ[name]) if os.environ.get(name) else None
+
+PASSWORD_PBKDF2_ITERATIONS = _env_int('PASSWORD_PBKDF2_ITERATIONS')
+PASSWORD_SCRYPT_WORK_FACTOR = _env_int('PASSWORD_SCRYPT_WORK_FACTOR')
+PASSWORD_SCRYPT_BLOCK_SIZE = _env_int('PASSWORD_SCRYPT_BLOCK_SIZE')
+PASSWORD_SCRYPT_PARALLELISM = _env_int('PASSWORD_SCRYPT_PARALLELISM')
+PASSWORD_ARGON2_TIME_COST = _env_int('PASSWORD_ARGON2_TIME_COST')
+PASSWORD_ARGON2_MEMORY_COST = _env_int('PASSWORD_ARGON2_MEMORY_COST')
+PASSWORD_ARGON2_PARALLELISM = _env_int('PASSWORD_ARGON2_PARALLELISM')
+
+# 登录时的密码校验在哈希进程池中执行
+AUTHENTICATION_BACKENDS = [
+    'demo.backends.HashingPoolBackend',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -149,6 +246,54 @@ CSRF_TRUSTED_ORIGINS = [
 # Whitenoise静态文件配置（生产环境启用）
 # STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Web服务器工作进程数（gunicorn 的 WEB_CONCURRENCY / entrypoint.sh 的 GUNICORN_WORKERS）
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or os.environ.get('GUNICORN_WORKERS') or 1)
+# 每个工作进程的密码哈希进程池大小（默认 CPU核数 // WEB_CONCURRENCY，0表示在请求进程内计算）及批量导入/批量操作的单次上限
+PASSWORD_HASHING_WORKERS = int(os.environ['PASSWORD_HASHING_WORKERS']) if os.environ.get('PASSWORD_HASHING_WORKERS') else None
+# 同时进行的哈希任务上限（默认进程数的4倍）及排队等待秒数，超出时返回503
+PASSWORD_HASHING_QUEUE_SIZE = int(os.environ['PASSWORD_HASHING_QUEUE_SIZE']) if os.environ.get('PASSWORD_HASHING_QUEUE_SIZE') else None
+PASSWORD_HASHING_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASHING_QUEUE_TIMEOUT', 0.5))
+# 等待单个哈希任务结果的最长秒数，及批量导入每次提交到进程池的密码数
+PASSWORD_HASHING_RESULT_TIMEOUT = float(os.environ.get('PASSWORD_HASHING_RESULT_TIMEOUT', 10))
+PASSWORD_HASHING_CHUNK_SIZE = int(os.environ.get('PASSWORD_HASHING_CHUNK_SIZE', 8))
+# 导入API在请求内同步计算哈希，需在 gunicorn 超时（默认30秒）内完成；更大的文件使用 import_users 命令
+BULK_IMPORT_MAX_ROWS = int(os.environ.get('BULK_IMPORT_MAX_ROWS', 500))
+BULK_OPERATION_MAX_IDS = int(os.environ.get('BULK_OPERATION_MAX_IDS', 1000))
+
+# 注册页用户名检查：占用结果缓存秒数，及每个客户端IP在窗口（秒）内允许的请求数
+USERNAME_CHECK_CACHE = 'default'
+USERNAME_CHECK_TIMEOUT = int(os.environ.get('USERNAME_CHECK_TIMEOUT', 30))
+USERNAME_CHECK_RATE_LIMIT = int(os.environ.get('USERNAME_CHECK_RATE_LIMIT', 30))
+USERNAME_CHECK_RATE_WINDOW = int(os.environ.get('USERNAME_CHECK_RATE_WINDOW', 10))
+# 应用前面受信任的反向代理层数（如 nginx 为1），限流按 X-Forwarded-For 中由代理写入的条目识别客户端；
+# 为0时只使用 REMOTE_ADDR
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+# 授权缓存：用户角色、用户组ID和权限集合的缓存秒数（用户组或权限变更时由信号清除）
+AUTHZ_CACHE = 'default'
+AUTHZ_TIMEOUT = int(os.environ.get('AUTHZ_TIMEOUT', 300))
+
+# 仪表盘增量刷新：单次同步最多读取的变更记录数（超出时整页重新加载），及 prune_changes 默认保留天数
+CHANGE_FEED_MAX_ENTRIES = int(os.environ.get('CHANGE_FEED_MAX_ENTRIES', 1000))
+CHANGE_FEED_RETENTION_DAYS = float(os.environ.get('CHANGE_FEED_RETENTION_DAYS', 7))
+
+# 实时事件推送（/events/，需要 ASGI）：事件后端、变更记录轮询间隔（秒）、保活间隔（秒）、
+# 单个连接最长秒数（到期后客户端自动重连）及每个连接的事件队列长度
+# 单进程部署可使用 'demo.events.LocalEventBackend'，多个工作进程需通过变更记录表共享事件
+EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'demo.events.ChangeLogEventBackend')
+EVENTS_POLL_INTERVAL = float(os.environ.get('EVENTS_POLL_INTERVAL', 1.0))
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))
+EVENTS_MAX_AGE = float(os.environ.get('EVENTS_MAX_AGE', 300))
+EVENTS_QUEUE_SIZE = 100
+
+# 请求级日志合并（默认关闭），安全日志默认不缓冲、立即写入
+LOG_REQUEST_BATCHING = os.environ.get('LOG_REQUEST_BATCHING', 'False').lower() in ('true', '1', 't')
+LOG_SECURITY_UNBUFFERED = os.environ.get('LOG_SECURITY_UNBUFFERED', 'True').lower() in ('true', '1', 't')
+
+# 请求指标（/metrics/ 接口，超级管理员或携带 METRICS_TOKEN 的Bearer请求可访问）
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True').lower() in ('true', '1', 't')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # 日志配置
 LOGGING = {
     'version': 1,
@@ -6,12 +6,14 @@ from .settings import *
 # 生产环境启用Whitenoise
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'demo.middleware.RequestMetricsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'demo.middleware.RequestLogBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -19,6 +21,18 @@ MIDDLEWARE = [
 # Whitenoise静态文件配置
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# 多个Gunicorn worker共享文件缓存，保证信号失效对所有worker可见
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', os.path.join(BASE_DIR, 'data', 'cache')),
+    },
+    'sessions': {
+        'BACKEND': os.environ.get('SESSION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', os.path.join(BASE_DIR, 'data', 'session_cache')),
+    },
+}
+
 # 生产环境安全设置
 DEBUG = False
 SECURE_SSL_REDIRECT = True
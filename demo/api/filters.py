@@ -0,0 +1,82 @@
+"""
+用户目录筛选模块
+
+解析 users_api 的 q / group / is_active 参数并转换为查询条件。
+用户名和邮箱的前缀匹配不区分大小写，写成 LOWER(字段) 上的范围条件，
+可以直接使用 migrations/0004_user_directory_indexes 中的表达式索引，
+而不是对全表执行 LIKE / UPPER 扫描。
+
+搜索词必须按数据库 LOWER() 的规则转换才能与索引值比较：SQLite 内置的 LOWER()
+只转换ASCII字母，因此在 SQLite 上非ASCII字母按原样（区分大小写）匹配。
+范围比较依赖列的排序规则，PostgreSQL 上应使用 "C" 排序规则的数据库或索引。
+"""
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from ..db import database_lower
+
+MAX_QUERY_LENGTH = 150
+
+
+class InvalidFilter(ValueError):
+    """筛选参数无效"""
+
+
+def _prefix_range(alias, prefix):
+    # 上界为前缀最后一个字符加一：以前缀开头的任何字符串（包括后接BMP以外字符的）都小于它
+    last = ord(prefix[-1])
+    if last >= 0x10FFFF:
+        return Q(**{f'{alias}__startswith': prefix})
+    upper = prefix[:-1] + chr(last + 1)
+    return Q(**{f'{alias}__gte': prefix, f'{alias}__lt': upper})
+
+
+def _parse_bool(value):
+    lowered = value.strip().lower()
+    if lowered in ('1', 'true', 't', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'f', 'no'):
+        return False
+    raise InvalidFilter('is_active 必须是 true 或 false')
+
+
+def filter_users(queryset, params):
+    """
+    按请求参数筛选用户
+
+    参数:
+        queryset (QuerySet): 用户查询集
+        params (QueryDict): 请求参数
+            - q (str, 可选): 用户名或邮箱前缀，不区分大小写
+            - group (int, 可选): 用户组ID
+            - is_active (bool, 可选): 是否激活
+
+    返回:
+        QuerySet: 筛选后的查询集
+
+    异常:
+        InvalidFilter: 参数格式错误
+    """
+    query = (params.get('q') or '').strip()
+    if len(query) > MAX_QUERY_LENGTH:
+        raise InvalidFilter(f'q 最长 {MAX_QUERY_LENGTH} 个字符')
+    if query:
+        query = database_lower(query, queryset.db)
+        queryset = queryset.alias(
+            username_lower=Lower('username'),
+            email_lower=Lower('email'),
+        ).filter(_prefix_range('username_lower', query) | _prefix_range('email_lower', query))
+
+    group = params.get('group')
+    if group not in (None, ''):
+        try:
+            group_id = int(group)
+        except ValueError:
+            raise InvalidFilter('group 必须是用户组ID')
+        queryset = queryset.filter(groups=group_id)
+
+    is_active = params.get('is_active')
+    if is_active not in (None, ''):
+        queryset = queryset.filter(is_active=_parse_bool(is_active))
+    return queryset
@@ -14,11 +14,13 @@ import json
 
 # 导入日志模块
 from ..logger import logger, log_operation, log_audit
+from ..routers import pin_primary
 
 
 @login_required(login_url='demo:login')
 @permission_required('auth.add_group', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def group_create(request):
     """
     创建新用户组API
@@ -58,6 +60,7 @@ def group_create(request):
 @login_required(login_url='demo:login')
 @permission_required('auth.change_group', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def group_update(request, group_id):
     """
     更新用户组信息API
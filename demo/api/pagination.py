@@ -0,0 +1,152 @@
+"""
+键集分页模块
+
+基于 (排序字段, id) 的键集（游标）分页，避免 OFFSET 扫描，
+使每页的查询耗时和内存占用不随用户总数增长。
+游标不包含排序方式，翻页时需要使用与第一页相同的 ordering。
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+# 每页默认条数与上限
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# 支持的排序方式，每种都有对应的 (字段, id) 索引，见 migrations/0004_user_directory_indexes
+ORDERINGS = ('username', '-username', 'date_joined', '-date_joined')
+DEFAULT_ORDERING = 'username'
+
+
+class InvalidCursor(ValueError):
+    """游标或分页参数无效"""
+
+
+def encode_cursor(value, user_id):
+    """
+    将排序键编码为不透明游标
+
+    参数:
+        value (str): 当前页最后一行的排序字段值（时间为ISO格式）
+        user_id (int): 当前页最后一行的用户ID
+
+    返回:
+        str: URL安全的base64游标
+    """
+    raw = json.dumps([value, user_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解码游标为 (排序字段值, id)
+
+    参数:
+        cursor (str): encode_cursor 生成的游标
+
+    返回:
+        tuple: (value, user_id)
+
+    异常:
+        InvalidCursor: 游标格式错误
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, user_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if not isinstance(value, str) or not isinstance(user_id, int):
+            raise ValueError
+        return value, user_id
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('无效的分页游标')
+
+
+def parse_page_size(value):
+    """
+    解析 limit 参数
+
+    参数:
+        value (str or None): 请求中的 limit 值
+
+    返回:
+        int: 限制在 [1, MAX_PAGE_SIZE] 内的每页条数
+
+    异常:
+        InvalidCursor: limit 不是正整数
+    """
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor('limit 必须是正整数')
+    if size < 1:
+        raise InvalidCursor('limit 必须是正整数')
+    return min(size, MAX_PAGE_SIZE)
+
+
+def parse_ordering(value):
+    """
+    解析 ordering 参数
+
+    异常:
+        InvalidCursor: 不支持的排序方式
+    """
+    if value in (None, ''):
+        return DEFAULT_ORDERING
+    if value not in ORDERINGS:
+        raise InvalidCursor(f"ordering 只能是 {', '.join(ORDERINGS)}")
+    return value
+
+
+def _page_queryset(queryset, limit, cursor, ordering):
+    field = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    queryset = queryset.order_by(ordering, '-id' if descending else 'id')
+    if cursor:
+        value, user_id = decode_cursor(cursor)
+        if field == 'date_joined':
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidCursor('无效的分页游标')
+        op = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': user_id})
+        )
+    # 多取一行用于判断是否还有下一页
+    return queryset[:limit + 1]
+
+
+def _split_page(rows, limit, ordering):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        value = getattr(last, ordering.lstrip('-'))
+        next_cursor = encode_cursor(value.isoformat() if isinstance(value, datetime) else value, last.id)
+    return rows, next_cursor
+
+
+def keyset_page(queryset, limit, cursor=None, ordering=DEFAULT_ORDERING):
+    """
+    按 (ordering, id) 取一页数据
+
+    参数:
+        queryset (QuerySet): 用户查询集
+        limit (int): 每页条数
+        cursor (str, 可选): 上一页返回的 next_cursor
+        ordering (str): ORDERINGS 之一
+
+    返回:
+        tuple: (当前页用户列表, next_cursor)，没有下一页时 next_cursor 为 None
+    """
+    return _split_page(list(_page_queryset(queryset, limit, cursor, ordering)), limit, ordering)
+
+
+async def akeyset_page(queryset, limit, cursor=None, ordering=DEFAULT_ORDERING):
+    """keyset_page 的异步版本，参数与返回值相同"""
+    rows = [row async for row in _page_queryset(queryset, limit, cursor, ordering)]
+    return _split_page(rows, limit, ordering)
@@ -2,8 +2,30 @@
 数据序列化模块
 
 提供数据序列化功能，将Django模型对象转换为JSON可序列化的字典格式。
+列表序列化函数会自行预取关联数据，查询次数与数据量无关。
 """
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group, User
+from django.db.models import Count, OuterRef, Prefetch, QuerySet, Subquery, prefetch_related_objects
+
+
+def _groups_prefetch():
+    """按ID排序预取用户组，保证“第一个用户组”与 groups.first() 一致"""
+    return Prefetch('groups', queryset=Group.objects.order_by('id'))
+
+
+def _primary_group(user):
+    """
+    获取用户的主用户组
+
+    已预取时直接读取缓存，否则退回到单次查询。
+    """
+    if 'groups' in getattr(user, '_prefetched_objects_cache', {}):
+        groups = user.groups.all()
+        return groups[0] if groups else None
+    return user.groups.first()
+
 def serialize_user(user):
     """
     序列化用户对象为字典格式
@@ -15,17 +37,20 @@ def serialize_user(user):
         dict: 包含用户信息的字典
             - id (int): 用户ID
             - username (str): 用户名
+            - full_name (str): 姓名（与 get_full_name 相同，可能为空字符串）
             - email (str): 邮箱地址
             - is_active (bool): 是否激活
             - group_name (str): 所属用户组名称（如果有）
             - date_joined (str): 注册时间（ISO格式）
     """
+    primary_group = _primary_group(user)
     return {
         'id': user.id,
         'username': user.username,
+        'full_name': user.get_full_name(),
         'email': user.email,
         'is_active': user.is_active,
-        'group_name': user.groups.first().name if user.groups.exists() else None,
+        'group_name': primary_group.name if primary_group else None,
         'date_joined': user.date_joined.isoformat() if user.date_joined else None,
     }
 
@@ -43,10 +68,13 @@ def serialize_group(group):
             - name (str): 用户组名称
             - user_count (int): 用户组中的用户数量
     """
+    user_count = getattr(group, 'member_count', None)
+    if user_count is None:
+        user_count = group.user_set.count()
     return {
         'id': group.id,
         'name': group.name,
-        'user_count': group.user_set.count(),
+        'user_count': user_count,
     }
 
 
@@ -54,23 +82,102 @@ def serialize_user_list(users):
     """
     序列化用户列表
     
+    查询集会自动加上用户组预取，已求值的列表会一次性补齐预取，
+    总共只需两次查询。
+    
     参数:
         users (QuerySet or list): 用户对象列表或查询集
     
     返回:
         list: 用户信息字典列表
     """
+    if isinstance(users, QuerySet):
+        users = users.prefetch_related(_groups_prefetch())
+    else:
+        users = list(users)
+        prefetch_related_objects(users, _groups_prefetch())
     return [serialize_user(user) for user in users]
 
 
+async def aserialize_user_list(users):
+    """
+    serialize_user_list 的异步版本
+
+    参数:
+        users (QuerySet or list): 用户对象列表或查询集
+
+    返回:
+        list: 用户信息字典列表
+    """
+    if isinstance(users, QuerySet):
+        return [serialize_user(user) async for user in users.prefetch_related(_groups_prefetch())]
+    return await sync_to_async(serialize_user_list)(users)
+
+
 def serialize_group_list(groups):
     """
     序列化用户组列表
     
+    查询集会自动加上成员数量注解，已求值的列表通过一次聚合查询补齐成员数量。
+    
     参数:
         groups (QuerySet or list): 用户组对象列表或查询集
     
     返回:
         list: 用户组信息字典列表
     """
-    return [serialize_group(group) for group in groups]
\ No newline at end of file
+    if isinstance(groups, QuerySet):
+        if 'member_count' not in groups.query.annotations:
+            groups = groups.annotate(member_count=Count('user', distinct=True))
+    else:
+        groups = list(groups)
+        counts = dict(
+            User.groups.through.objects
+            .filter(group_id__in=[group.id for group in groups])
+            .values('group_id')
+            .annotate(total=Count('user_id'))
+            .values_list('group_id', 'total')
+        )
+        for group in groups:
+            group.member_count = counts.get(group.id, 0)
+    return [serialize_group(group) for group in groups]
+
+
+def user_rows(queryset):
+    """
+    将用户查询集转换为适合流式输出的 values() 行
+
+    主用户组名称通过相关子查询取得，整个列表只需一次查询。
+    
+    参数:
+        queryset (QuerySet): 用户查询集
+    
+    返回:
+        QuerySet: 字段与 serialize_user 一致的 values() 查询集
+    """
+    primary_group_name = Subquery(
+        User.groups.through.objects
+        .filter(user_id=OuterRef('pk'))
+        .order_by('group_id')
+        .values('group__name')[:1]
+    )
+    return queryset.annotate(group_name=primary_group_name).values(
+        'id', 'username', 'first_name', 'last_name', 'email', 'is_active', 'group_name', 'date_joined'
+    )
+
+
+def serialize_user_row(row):
+    """
+    序列化 user_rows 产生的一行，输出格式与 serialize_user 相同
+    
+    参数:
+        row (dict): user_rows 查询集中的一行
+    
+    返回:
+        dict: 包含用户信息的字典
+    """
+    date_joined = row['date_joined']
+    row['date_joined'] = date_joined.isoformat() if date_joined else None
+    # 与 User.get_full_name 相同的拼接规则
+    row['full_name'] = f"{row.pop('first_name')} {row.pop('last_name')}".strip()
+    return row
\ No newline at end of file
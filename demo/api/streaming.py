@@ -0,0 +1,129 @@
+"""
+流式JSON响应模块
+
+将查询集按块迭代并逐段编码输出，避免在内存中同时持有
+完整的字典列表和编码后的字符串，首字节时间与数据量无关。
+"""
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+# 每次从数据库读取的行数
+STREAM_CHUNK_SIZE = 2000
+# 每累积多少行输出一次
+STREAM_FLUSH_ROWS = 500
+
+
+class _ArrayWriter:
+    """逐行编码数组元素，每 STREAM_FLUSH_ROWS 行返回一段"""
+
+    def __init__(self, encoder, transform):
+        self.encoder = encoder
+        self.transform = transform
+        self.buffer = []
+        self.first = True
+
+    def add(self, row):
+        if self.transform is not None:
+            row = self.transform(row)
+        encoded = self.encoder.encode(row)
+        self.buffer.append(encoded if self.first else ', ' + encoded)
+        self.first = False
+        if len(self.buffer) >= STREAM_FLUSH_ROWS:
+            return self.flush()
+        return None
+
+    def flush(self):
+        chunk = ''.join(self.buffer)
+        self.buffer = []
+        return chunk
+
+
+def _json_head(encoder, key, extra):
+    head = ''.join(
+        f'{encoder.encode(name)}: {encoder.encode(value)}, '
+        for name, value in (extra or {}).items()
+    )
+    return '{' + head + encoder.encode(key) + ': ['
+
+
+def iter_json_object(key, rows, extra=None, transform=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    逐段生成 {**extra, key: [row, ...]} 形式的JSON文本
+
+    参数:
+        key (str): 数组字段名
+        rows (QuerySet or iterable): 行数据，查询集会以 iterator(chunk_size) 方式读取
+        extra (dict, 可选): 数组之前输出的其他字段
+        transform (callable, 可选): 输出前对每一行的转换
+        chunk_size (int): 数据库读取块大小
+
+    生成:
+        str: 编码后的JSON片段
+    """
+    encoder = DjangoJSONEncoder()
+    yield _json_head(encoder, key, extra)
+
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=chunk_size)
+
+    writer = _ArrayWriter(encoder, transform)
+    for row in rows:
+        chunk = writer.add(row)
+        if chunk:
+            yield chunk
+    tail = writer.flush()
+    if tail:
+        yield tail
+    yield ']}'
+
+
+async def aiter_json_object(key, rows, extra=None, transform=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    iter_json_object 的异步版本，查询集以 aiterator(chunk_size) 方式读取
+
+    参数与 iter_json_object 相同，rows 也可以是异步可迭代对象。
+    """
+    encoder = DjangoJSONEncoder()
+    yield _json_head(encoder, key, extra)
+
+    if isinstance(rows, QuerySet):
+        rows = rows.aiterator(chunk_size=chunk_size)
+
+    writer = _ArrayWriter(encoder, transform)
+    async for row in rows:
+        chunk = writer.add(row)
+        if chunk:
+            yield chunk
+    tail = writer.flush()
+    if tail:
+        yield tail
+    yield ']}'
+
+
+def is_asgi_request(request):
+    """请求是否来自ASGI服务器（此时流式响应应使用异步迭代器）"""
+    return isinstance(request, ASGIRequest)
+
+
+def streaming_json_response(key, rows, extra=None, transform=None, chunk_size=STREAM_CHUNK_SIZE,
+                            asynchronous=False):
+    """
+    构造流式JSON响应
+
+    参数与 iter_json_object 相同。asynchronous 为 True 时使用 aiter_json_object，
+    供ASGI下的异步视图使用；WSGI下异步迭代器会被整体读入内存，因此应保持 False。
+
+    返回:
+        StreamingHttpResponse: Content-Type 为 application/json 的流式响应
+    """
+    if isinstance(rows, QuerySet):
+        # 在视图内确定数据库（如只读副本），输出内容时视图的路由上下文已经结束
+        rows = rows.using(rows.db)
+    iterate = aiter_json_object if asynchronous else iter_json_object
+    return StreamingHttpResponse(
+        iterate(key, rows, extra=extra, transform=transform, chunk_size=chunk_size),
+        content_type='application/json',
+    )
@@ -10,15 +10,43 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required, permission_required
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User, Group
+from django.conf import settings
+from django.db import transaction
+from itertools import islice
 import json
 
 # 导入日志模块
 from ..logger import logger, log_operation, log_audit, log_security
+from .streaming import streaming_json_response
+from ..bulk_import import decode_lines, detect_format, import_users, parse_rows
+from ..stats import invalidate_dashboard_stats
+from ..usernames import invalidate_usernames, username_taken
+from ..hashing import HashingBusy, set_password
+from ..routers import pin_primary, use_read_replica
+from ..changefeed import USER, record_changes
+from ..authz import ROLE_USER, get_authorization, invalidate_authorization, is_superadmin, well_known_group_id
+
+# 批量操作及其所需权限
+BULK_ACTIONS = {
+    'activate': 'auth.change_user',
+    'deactivate': 'auth.change_user',
+    'move_group': 'auth.change_user',
+    'delete': 'auth.delete_user',
+}
+
+
+def _hashing_busy_response(request):
+    """密码哈希队列已满时快速返回503"""
+    log_operation("密码哈希队列已满，请求被拒绝", request, level="WARNING")
+    response = JsonResponse({'status': 'error', 'message': '服务器繁忙，请稍后重试'}, status=503)
+    response['Retry-After'] = str(HashingBusy.retry_after)
+    return response
 
 
 @login_required(login_url='demo:login')
 @permission_required('auth.add_user', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def user_create(request):
     """
     创建新用户API
@@ -49,8 +77,8 @@ def user_create(request):
         is_active = data.get('is_active', True)
         log_operation(f"管理员 {request.user.username} 尝试创建用户: {username}", request)
         
-        # 检查用户名是否已存在
-        if User.objects.filter(username=username).exists():
+        # 检查用户名是否已存在（不区分大小写）
+        if username_taken(username or ''):
             log_operation(f"用户创建失败: {username} - 用户名已存在", request)
             return JsonResponse({'status': 'error', 'message': '用户名已存在'}, status=400)
         
@@ -60,13 +88,14 @@ def user_create(request):
             log_operation(f"用户创建失败: {username} - 创建用户时密码不能为空", request)
             return JsonResponse({'status': 'error', 'message': '创建用户时密码不能为空'}, status=400)
         
-        # 创建用户
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password
+        # 创建用户（密码哈希在进程池中计算）
+        user = User(
+            username=User.normalize_username(username),
+            email=User.objects.normalize_email(email)
         )
+        set_password(user, password)
         user.is_active = is_active
+        user.save()
         
         # 添加到指定用户组
         if group_id:
@@ -76,14 +105,69 @@ def user_create(request):
         user.save()
         log_audit(f"用户创建成功: {username}", request, context="user_management")
         return JsonResponse({'status': 'success', 'message': '用户创建成功'})
+    except HashingBusy:
+        return _hashing_busy_response(request)
     except Exception as e:
         log_operation(f"用户创建失败: {username} - {str(e)}", request, level="ERROR")
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
 
+@login_required(login_url='demo:login')
+@permission_required('auth.add_user', login_url='demo:login')
+@require_http_methods(["POST"])
+@pin_primary
+def user_import(request):
+    """
+    批量导入用户API
+    
+    需要权限: auth.add_user
+    请求方法: POST
+    请求体: JSON Lines（每行一个用户对象）或带表头的CSV
+    查询参数:
+        - format (str, 可选): jsonl 或 csv，默认根据 Content-Type 判断
+    
+    返回:
+        {'status': 'success', 'total': 行数, 'created': 成功数, 'failed': 失败数,
+         'errors': [{'line': 行号, 'username': 用户名, 'error': 错误信息}, ...]}
+    
+    说明:
+        - 单行错误不会中断导入，其余行照常写入
+        - 每个密码都要计算哈希，请求内同步导入只适合少量数据：超过 BULK_IMPORT_MAX_ROWS 行时
+          返回413且不导入任何数据，大文件使用 python manage.py import_users 导入
+    """
+    fmt = detect_format(request.content_type, explicit=request.GET.get('format'))
+    log_operation(f"管理员 {request.user.username} 开始批量导入用户 (格式: {fmt})", request)
+    max_rows = getattr(settings, 'BULK_IMPORT_MAX_ROWS', 500)
+    try:
+        # 多读一行用于判断是否超出上限
+        rows = list(islice(parse_rows(decode_lines(request), fmt), max_rows + 1))
+    except UnicodeDecodeError:
+        log_operation("批量导入用户失败: 请求体不是UTF-8编码", request, level="WARNING")
+        return JsonResponse({'status': 'error', 'message': '请求体必须是UTF-8编码'}, status=400)
+    if len(rows) > max_rows:
+        log_operation(f"批量导入用户被拒绝: 超过 {max_rows} 行", request, level="WARNING")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'单次最多导入 {max_rows} 行，更大的文件请使用 python manage.py import_users 导入',
+        }, status=413)
+
+    try:
+        result = import_users(rows)
+    except Exception as e:
+        log_operation(f"批量导入用户失败: {str(e)}", request, level="ERROR")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+    log_audit(
+        f"批量导入用户: 共 {result.total} 行, 创建成功 {result.created}, 失败 {len(result.errors)}",
+        request, context="user_management"
+    )
+    return JsonResponse({'status': 'success', **result.as_dict()})
+
+
 @login_required(login_url='demo:login')
 @permission_required('auth.change_user', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def user_update(request, user_id):
     """
     更新用户信息API
@@ -114,12 +198,13 @@ def user_update(request, user_id):
         username = data.get('username')
         log_operation(f"管理员 {request.user.username} 尝试更新用户信息: {user.username} -> {username}", request)
         
-        # 检查新用户名是否已存在（排除当前用户）
-        if User.objects.exclude(pk=user_id).filter(username=username).exists():
+        # 检查新用户名是否已存在（不区分大小写，排除当前用户）
+        if username_taken(username or '', exclude_id=user_id):
             log_operation(f"用户信息更新失败: {username} - 用户名已存在", request)
             return JsonResponse({'status': 'error', 'message': '用户名已存在'}, status=400)
         
         # 更新基本信息
+        old_username = user.username
         user.username = username
         user.email = data.get('email', '')
         user.is_active = data.get('is_active', True)
@@ -127,7 +212,7 @@ def user_update(request, user_id):
         # 如果提供了新密码，则更新密码
         password = data.get('password')
         if password:
-            user.set_password(password)
+            set_password(user, password)
             log_security(f"用户密码已更新: {username}", request)
         
         # 更新用户组
@@ -139,8 +224,13 @@ def user_update(request, user_id):
             log_operation(f"用户组已更新: {username} -> {group.name}", request)
         
         user.save()
+        if old_username != username:
+            # 新用户名由 post_save 信号清除，旧用户名需要在这里清除
+            invalidate_usernames([old_username])
         log_audit(f"用户信息更新成功: {username}", request, context="user_management")
         return JsonResponse({'status': 'success', 'message': '用户信息更新成功'})
+    except HashingBusy:
+        return _hashing_busy_response(request)
     except Exception as e:
         log_operation(f"用户信息更新失败: {username} - {str(e)}", request, level="ERROR")
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
@@ -149,6 +239,7 @@ def user_update(request, user_id):
 @login_required(login_url='demo:login')
 @permission_required('auth.delete_user', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def user_delete(request, user_id):
     """
     删除用户API
@@ -186,6 +277,7 @@ def user_delete(request, user_id):
 @login_required(login_url='demo:login')
 @permission_required('auth.change_user', login_url='demo:login')
 @require_http_methods(["POST"])
+@pin_primary
 def change_user_group(request, user_id):
     """
     修改用户组API
@@ -211,9 +303,8 @@ def change_user_group(request, user_id):
         current_user = request.user
         
         # 权限检查：非超级管理员只能管理普通用户
-        if not current_user.groups.filter(name='超级管理员').exists():
-            user_group = Group.objects.get(name='普通用户')
-            if not user.groups.filter(id=user_group.id).exists():
+        if not is_superadmin(current_user):
+            if well_known_group_id(ROLE_USER) not in get_authorization(user).group_ids:
                 log_operation(f"用户组更新失败: {current_user.username} 尝试管理非普通用户 {user.username}", request)
                 return JsonResponse({
                     'status': 'error',
@@ -255,8 +346,119 @@ def change_user_group(request, user_id):
         }, status=500)
 
 
+@login_required(login_url='demo:login')
+@require_http_methods(["POST"])
+@pin_primary
+def user_bulk_action(request):
+    """
+    批量用户操作API
+    
+    请求方法: POST
+    请求参数:
+        - user_ids (list[int]): 用户ID列表
+        - action (str): activate / deactivate / delete / move_group
+        - group_id (int, 可选): move_group 的目标用户组ID，为空则移出所有用户组
+    
+    需要权限:
+        - activate / deactivate / move_group: auth.change_user
+        - delete: auth.delete_user
+    
+    返回:
+        - 成功: {'status': 'success', 'message': ..., 'affected': 数量, 'not_found': [ID, ...]}
+        - 失败: {'status': 'error', 'message': 错误信息}
+    
+    权限限制（与 change_user_group 一致）:
+        - 普通管理员只能操作普通用户，否则整批拒绝 (403)
+        - 不能对自己执行批量操作 (400)
+    
+    说明:
+        - 所有修改在同一事务中以集合方式执行（update/delete/批量插入用户组关系）
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': '请求体必须是JSON'}, status=400)
+
+    action = data.get('action')
+    current_user = request.user
+    if action not in BULK_ACTIONS:
+        return JsonResponse({'status': 'error', 'message': f'不支持的操作: {action}'}, status=400)
+    if not current_user.has_perm(BULK_ACTIONS[action]):
+        log_operation(f"批量操作失败: {current_user.username} 没有 {action} 权限", request)
+        return JsonResponse({'status': 'error', 'message': '没有权限'}, status=403)
+
+    try:
+        user_ids = sorted({int(user_id) for user_id in data.get('user_ids') or []})
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'user_ids 必须是整数列表'}, status=400)
+    if not user_ids:
+        return JsonResponse({'status': 'error', 'message': 'user_ids 不能为空'}, status=400)
+    max_ids = getattr(settings, 'BULK_OPERATION_MAX_IDS', 1000)
+    if len(user_ids) > max_ids:
+        return JsonResponse({'status': 'error', 'message': f'单次最多操作 {max_ids} 个用户'}, status=400)
+    if current_user.id in user_ids:
+        log_operation(f"批量操作失败: {current_user.username} 尝试对自己执行 {action}", request)
+        return JsonResponse({'status': 'error', 'message': '不能对当前登录用户执行批量操作'}, status=400)
+
+    log_operation(f"管理员 {current_user.username} 尝试批量操作 {action}: {len(user_ids)} 个用户", request)
+    targets = User.objects.filter(pk__in=user_ids)
+    found_ids = set(targets.values_list('id', flat=True))
+    not_found = [user_id for user_id in user_ids if user_id not in found_ids]
+
+    # 权限检查：非超级管理员只能管理普通用户
+    if not is_superadmin(current_user):
+        allowed_ids = set(targets.filter(groups=well_known_group_id(ROLE_USER)).values_list('id', flat=True))
+        forbidden = sorted(found_ids - allowed_ids)
+        if forbidden:
+            log_operation(f"批量操作失败: {current_user.username} 尝试管理非普通用户 {forbidden}", request)
+            return JsonResponse({
+                'status': 'error',
+                'message': '您只能管理普通用户',
+                'forbidden': forbidden
+            }, status=403)
+
+    group = None
+    if action == 'move_group' and data.get('group_id'):
+        group = Group.objects.filter(pk=data.get('group_id')).first()
+        if group is None:
+            return JsonResponse({'status': 'error', 'message': '用户组不存在'}, status=400)
+
+    try:
+        ids = sorted(found_ids)
+        with transaction.atomic():
+            if action in ('activate', 'deactivate'):
+                affected = User.objects.filter(pk__in=ids).update(is_active=(action == 'activate'))
+                record_changes(USER, ids)
+            elif action == 'delete':
+                User.objects.filter(pk__in=ids).delete()
+                affected = len(ids)
+            else:
+                Membership = User.groups.through
+                Membership.objects.filter(user_id__in=ids).delete()
+                if group is not None:
+                    Membership.objects.bulk_create([Membership(user_id=user_id, group_id=group.id) for user_id in ids])
+                record_changes(USER, ids)
+                affected = len(ids)
+    except Exception as e:
+        log_operation(f"批量操作失败: {action} - {str(e)}", request, level="ERROR")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+    # update() 和直接操作关系表不会触发信号，需要手动使统计和授权缓存失效
+    invalidate_dashboard_stats()
+    invalidate_authorization(ids)
+    target_desc = f" -> {group.name if group else '无组'}" if action == 'move_group' else ''
+    log_audit(f"批量用户操作成功: {action}{target_desc}, 用户 {ids}", request, context="user_management")
+    return JsonResponse({
+        'status': 'success',
+        'message': '批量操作成功',
+        'affected': affected,
+        'not_found': not_found
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
+@pin_primary
 def change_password(request, user_id):
     """
     修改用户密码API
@@ -292,11 +494,13 @@ def change_password(request, user_id):
             return JsonResponse({'status': 'error', 'message': '新密码不能为空'}, status=400)
         
         # 修改密码
-        user.set_password(new_password)
+        set_password(user, new_password)
         user.save()
         log_security(f"密码修改成功: {user.username}", request)
         log_audit(f"用户密码变更: {user.username}", request, context="user_management")
         return JsonResponse({'status': 'success', 'message': '密码修改成功'})
+    except HashingBusy:
+        return _hashing_busy_response(request)
     except Exception as e:
         log_operation(f"密码修改失败: {user.username} - {str(e)}", request, level="ERROR")
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
@@ -304,6 +508,7 @@ def change_password(request, user_id):
 
 @login_required(login_url='demo:login')
 @permission_required('auth.change_user', login_url='demo:login')
+@use_read_replica
 def available_users_for_group(request, group_id):
     """
     获取可添加到指定用户组的用户列表API
@@ -338,20 +543,11 @@ def available_users_for_group(request, group_id):
     log_operation(f"查询可分配到用户组 '{group.name}' 的用户", request)
 
     # 权限限制：非超级管理员只能看到普通用户
-    if not current_user.groups.filter(name='超级管理员').exists():
-        user_group = Group.objects.get(name='普通用户')
-        available_users = available_users.filter(groups=user_group)
+    if not is_superadmin(current_user):
+        available_users = available_users.filter(groups=well_known_group_id(ROLE_USER))
         log_operation(f"管理员 {current_user.username} 只能管理普通用户", request)
 
     user_count = available_users.count()
     log_operation(f"用户组 '{group.name}' 可分配用户数量: {user_count}", request)
 
-    return JsonResponse({
-        'users': [
-            {
-                'id': user.id,
-                'username': user.username
-            }
-            for user in available_users
-        ]
-    })
\ No newline at end of file
+    return streaming_json_response('users', available_users.values('id', 'username'))
\ No newline at end of file
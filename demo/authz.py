@@ -0,0 +1,145 @@
+"""
+授权信息缓存模块
+
+将用户的角色（超级管理员/管理员/普通用户）、所属用户组ID和权限集合，
+以及三个默认角色用户组的ID缓存起来，权限检查在缓存命中时不访问数据库。
+
+缓存键带有全局版本号：用户组或用户组权限变化时递增版本号使全部条目失效，
+单个用户的用户组、权限或状态变化时只删除该用户的条目。失效由 signals.py 中的
+信号处理器触发；update()/bulk_create 等不触发信号的批量写入需要手动调用
+invalidate_authorization。
+
+授权信息总是从主库读取：在 use_read_replica 视图内重新计算时，若读取有延迟的副本，
+失效后写回缓存的仍是旧权限，撤销的权限会在 AUTHZ_TIMEOUT 内继续生效。
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+ROLE_SUPERADMIN = '超级管理员'
+ROLE_ADMIN = '管理员'
+ROLE_USER = '普通用户'
+# 按优先级排列，同时属于多个角色组时取第一个
+ROLES = (ROLE_SUPERADMIN, ROLE_ADMIN, ROLE_USER)
+
+VERSION_KEY = 'demo:authz:version'
+
+Authorization = namedtuple('Authorization', ['role', 'group_ids', 'perms'])
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTHZ_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'AUTHZ_TIMEOUT', 300)
+
+
+def _version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def _user_key(user_id, version):
+    return f'demo:authz:user:{user_id}:{version}'
+
+
+def well_known_group_ids():
+    """
+    获取默认角色用户组的ID
+
+    返回:
+        dict: {角色名称: 用户组ID}，不存在的角色不包含在内
+    """
+    cache = _cache()
+    key = f'demo:authz:groups:{_version(cache)}'
+    group_ids = cache.get(key)
+    if group_ids is None:
+        group_ids = dict(Group.objects.using(DEFAULT_DB_ALIAS).filter(name__in=ROLES).values_list('name', 'id'))
+        cache.set(key, group_ids, _timeout())
+    return group_ids
+
+
+def well_known_group_id(role):
+    """
+    获取默认角色用户组的ID
+
+    异常:
+        Group.DoesNotExist: 该用户组不存在（与 Group.objects.get 行为一致）
+    """
+    group_id = well_known_group_ids().get(role)
+    if group_id is None:
+        raise Group.DoesNotExist(f'用户组不存在: {role}')
+    return group_id
+
+
+def _compute(user):
+    memberships = User.groups.through.objects.using(DEFAULT_DB_ALIAS)
+    group_ids = frozenset(memberships.filter(user_id=user.pk).values_list('group_id', flat=True))
+    role_ids = well_known_group_ids()
+    role = next((name for name in ROLES if role_ids.get(name) in group_ids), None)
+    # 与 ModelBackend 的权限计算规则一致（超级管理员拥有全部权限），
+    # 是否启用由认证后端在读取缓存前判断，这里按启用状态计算
+    permissions = Permission.objects.using(DEFAULT_DB_ALIAS)
+    if not user.is_superuser:
+        permissions = permissions.filter(Q(user=user.pk) | Q(group__user=user.pk))
+    perms = frozenset(
+        f'{app_label}.{codename}'
+        for app_label, codename in permissions.values_list('content_type__app_label', 'codename').distinct()
+    )
+    return Authorization(role, group_ids, perms)
+
+
+def get_authorization(user):
+    """
+    获取用户的授权信息，同一请求内的用户对象只读取一次缓存
+
+    参数:
+        user (User): 已登录用户
+
+    返回:
+        Authorization: (role, group_ids, perms)，role 为 None 表示不属于任何默认角色
+    """
+    authz = getattr(user, '_authz', None)
+    if authz is None:
+        cache = _cache()
+        key = _user_key(user.pk, _version(cache))
+        authz = cache.get(key)
+        if authz is None:
+            authz = _compute(user)
+            cache.set(key, authz, _timeout())
+        user._authz = authz
+    return authz
+
+
+def is_superadmin(user):
+    """用户是否属于超级管理员用户组"""
+    return get_authorization(user).role == ROLE_SUPERADMIN
+
+
+def invalidate_authorization(user_ids=None):
+    """
+    使授权缓存失效
+
+    参数:
+        user_ids (iterable, 可选): 要失效的用户ID，为 None 时使全部用户及默认角色组ID失效
+    """
+    cache = _cache()
+    if user_ids is None:
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, 1, timeout=None)
+        return
+    version = _version(cache)
+    keys = [_user_key(user_id, version) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
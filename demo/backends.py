@@ -0,0 +1,49 @@
+"""
+认证后端模块
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .authz import get_authorization
+from .hashing import hash_password, verify_password
+
+
+class HashingPoolBackend(ModelBackend):
+    """
+    与 ModelBackend 行为一致的认证后端，密码校验在哈希进程池中执行
+
+    哈希队列已满时抛出 demo.hashing.HashingBusy，由调用方返回503。
+    密码正确且哈希需要升级时保存新哈希，并在用户对象上设置 password_rehashed。
+    权限集合从 demo.authz 的授权缓存读取，缓存命中时权限检查不查询数据库。
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # 与 ModelBackend 一样执行一次哈希，缩小用户存在与否的时间差
+            hash_password(password)
+            return None
+
+        is_correct, upgraded = verify_password(password, user.password)
+        if is_correct and upgraded:
+            # 哈希方案或成本参数已变化，按当前配置重新哈希
+            user.password = upgraded
+            user.save(update_fields=['password'])
+            user.password_rehashed = True
+        if is_correct and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = set(get_authorization(user_obj).perms)
+        return user_obj._perm_cache
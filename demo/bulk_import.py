@@ -0,0 +1,304 @@
+"""
+批量导入用户模块
+
+支持 JSON Lines 与 CSV 两种格式。按批处理：每批用一次查询检查已存在的用户名，
+在进程池中计算密码哈希，再用 bulk_create 写入用户和用户组关系。
+单行错误只记录在结果中，不会中断整个导入；整批写入失败（如并发插入了同名用户）时
+逐行重试，每行使用独立的保存点，只有出错的行记为失败。
+
+每行字段:
+    - username (str): 用户名（必填）
+    - password (str): 密码（必填）
+    - email (str, 可选): 邮箱地址
+    - first_name / last_name (str, 可选): 姓名
+    - is_active (bool, 可选): 是否激活，默认为True
+    - group (str, 可选): 用户组名称
+    - group_id (int, 可选): 用户组ID，优先于 group
+"""
+
+import csv
+import json
+import re
+
+from django.contrib.auth.models import User, Group
+from django.db import transaction
+
+from .changefeed import CREATED, USER, record_changes
+from .hashing import HashingBusy, hash_passwords
+from .stats import invalidate_dashboard_stats
+from .usernames import invalidate_usernames, taken_usernames, username_key
+
+IMPORT_BATCH_SIZE = 1000
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+USERNAME_PATTERN = re.compile(r'^[\w.@+-]+\Z')
+
+FORMAT_JSONL = 'jsonl'
+FORMAT_CSV = 'csv'
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'on'}
+
+
+class ImportResult:
+    """导入结果汇总"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, username, message):
+        self.errors.append({'line': line, 'username': username, 'error': message})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+def detect_format(content_type=None, filename=None, explicit=None):
+    """根据显式参数、文件名或Content-Type判断格式，默认 JSON Lines"""
+    if explicit:
+        return FORMAT_CSV if explicit.lower() == FORMAT_CSV else FORMAT_JSONL
+    if filename and filename.lower().endswith('.csv'):
+        return FORMAT_CSV
+    if content_type and 'csv' in content_type.lower():
+        return FORMAT_CSV
+    return FORMAT_JSONL
+
+
+def parse_rows(lines, fmt):
+    """
+    逐行解析导入数据
+
+    参数:
+        lines (iterable): 文本行
+        fmt (str): FORMAT_JSONL 或 FORMAT_CSV
+
+    生成:
+        tuple: (行号, 数据字典或None, 解析错误或None)
+    """
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key}, None
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f'JSON格式错误: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, '每行必须是JSON对象'
+            continue
+        yield line_no, row, None
+
+
+def decode_lines(lines, encoding='utf-8'):
+    """将字节行解码为文本，并去掉开头的BOM"""
+    first = True
+    for line in lines:
+        text = line.decode(encoding) if isinstance(line, bytes) else line
+        if first:
+            text = text.lstrip('\ufeff')
+            first = False
+        yield text
+
+
+def _as_bool(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class _GroupResolver:
+    """按名称或ID解析用户组，每批最多一次查询"""
+
+    def __init__(self):
+        self.ids = set()
+        self.by_name = {}
+
+    def prefetch(self, rows):
+        ids = set()
+        names = set()
+        for row in rows:
+            group_id = row.get('group_id')
+            if group_id not in (None, ''):
+                try:
+                    ids.add(int(group_id))
+                except (TypeError, ValueError):
+                    pass
+            elif row.get('group'):
+                names.add(str(row['group']).strip())
+        ids -= self.ids
+        names -= set(self.by_name)
+        if not ids and not names:
+            return
+        query = Group.objects.none()
+        if ids:
+            query = query | Group.objects.filter(pk__in=ids)
+        if names:
+            query = query | Group.objects.filter(name__in=names)
+        for group_id, name in query.values_list('id', 'name'):
+            self.ids.add(group_id)
+            self.by_name[name] = group_id
+
+    def resolve(self, row):
+        """返回 (group_id或None, 错误或None)"""
+        group_id = row.get('group_id')
+        if group_id not in (None, ''):
+            try:
+                group_id = int(group_id)
+            except (TypeError, ValueError):
+                return None, f'无效的用户组ID: {group_id}'
+            if group_id not in self.ids:
+                return None, f'用户组不存在: {group_id}'
+            return group_id, None
+        name = str(row.get('group') or '').strip()
+        if not name:
+            return None, None
+        if name not in self.by_name:
+            return None, f'用户组不存在: {name}'
+        return self.by_name[name], None
+
+
+def _new_user(username, row, password_hash):
+    return User(
+        username=username,
+        email=str(row.get('email') or '').strip(),
+        first_name=str(row.get('first_name') or '').strip(),
+        last_name=str(row.get('last_name') or '').strip(),
+        is_active=_as_bool(row.get('is_active')),
+        password=password_hash,
+    )
+
+
+def _write_users(entries):
+    """
+    在一个事务（或保存点）中写入用户、用户组关系和变更记录
+
+    参数:
+        entries (list): [(User, 用户组ID或None), ...]
+
+    返回:
+        list: 已写入的用户
+    """
+    with transaction.atomic():
+        created = User.objects.bulk_create([user for user, _ in entries])
+        if any(user.pk is None for user in created):
+            ids = dict(User.objects.filter(username__in=[user.username for user in created])
+                       .values_list('username', 'id'))
+            for user in created:
+                user.pk = ids[user.username]
+        Membership = User.groups.through
+        Membership.objects.bulk_create([
+            Membership(user_id=user.pk, group_id=group_id)
+            for user, (_, group_id) in zip(created, entries) if group_id is not None
+        ])
+        # bulk_create 不触发 post_save 信号，在同一事务中写入变更记录
+        record_changes(USER, [user.pk for user in created], CREATED)
+    return created
+
+
+def _import_batch(batch, seen, groups, result):
+    """校验、哈希并写入一批数据"""
+    groups.prefetch(row for _, row in batch)
+    usernames = [str(row.get('username') or '').strip() for _, row in batch]
+    # 用户名不区分大小写：seen 和 existing 中都是 username_key 转换后的比较键
+    existing = taken_usernames(usernames)
+
+    pending = []
+    for (line_no, row), username in zip(batch, usernames):
+        password = row.get('password')
+        key = username_key(username)
+        if not username:
+            result.add_error(line_no, username, '用户名不能为空')
+        elif len(username) > USERNAME_MAX_LENGTH or not USERNAME_PATTERN.match(username):
+            result.add_error(line_no, username, '用户名格式无效')
+        elif key in seen:
+            result.add_error(line_no, username, '导入数据中用户名重复')
+        elif key in existing:
+            result.add_error(line_no, username, '用户名已存在')
+        elif not password:
+            result.add_error(line_no, username, '密码不能为空')
+        else:
+            group_id, error = groups.resolve(row)
+            if error:
+                result.add_error(line_no, username, error)
+                continue
+            seen.add(key)
+            pending.append((line_no, username, row, str(password), group_id))
+
+    if not pending:
+        return
+
+    try:
+        hashes = hash_passwords(item[3] for item in pending)
+    except HashingBusy as e:
+        for line_no, username, _, _, _ in pending:
+            seen.discard(username_key(username))
+            result.add_error(line_no, username, f'密码哈希失败: {e}')
+        return
+    try:
+        created = _write_users([
+            (_new_user(username, row, password_hash), group_id)
+            for (_, username, row, _, group_id), password_hash in zip(pending, hashes)
+        ])
+    except Exception:
+        # 整批回滚后逐行重试，错误只记录在对应的行上
+        created = []
+        for (line_no, username, row, _, group_id), password_hash in zip(pending, hashes):
+            try:
+                created += _write_users([(_new_user(username, row, password_hash), group_id)])
+            except Exception as e:
+                seen.discard(username_key(username))
+                result.add_error(line_no, username, f'写入失败: {e}')
+    result.created += len(created)
+    # bulk_create 不触发 post_save 信号，需要手动清除用户名可用性缓存
+    invalidate_usernames([user.username for user in created])
+
+
+def import_users(rows, batch_size=IMPORT_BATCH_SIZE, max_rows=None):
+    """
+    批量导入用户
+
+    参数:
+        rows (iterable): parse_rows 生成的 (行号, 数据, 解析错误)
+        batch_size (int): 每批处理的行数
+        max_rows (int, 可选): 最多处理的行数，超出时停止读取并记录一条错误
+
+    返回:
+        ImportResult: 导入结果
+    """
+    result = ImportResult()
+    seen = set()
+    groups = _GroupResolver()
+    batch = []
+    for line_no, row, error in rows:
+        result.total += 1
+        if max_rows is not None and result.total > max_rows:
+            result.total -= 1
+            result.add_error(line_no, None, f'超过单次导入上限 {max_rows} 行，其余数据未处理')
+            break
+        if error:
+            result.add_error(line_no, None, error)
+            continue
+        batch.append((line_no, row))
+        if len(batch) >= batch_size:
+            _import_batch(batch, seen, groups, result)
+            batch = []
+    if batch:
+        _import_batch(batch, seen, groups, result)
+
+    # bulk_create 不触发 post_save 信号，需要手动使统计缓存失效
+    if result.created:
+        invalidate_dashboard_stats()
+    return result
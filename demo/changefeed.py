@@ -0,0 +1,226 @@
+"""
+变更订阅模块
+
+用户和用户组的每次变更都会写入一条 ChangeLogEntry，其自增主键作为全局版本号。
+客户端按“已同步到的最大版本号”增量拉取，因此版本号必须按提交顺序分配：
+SQLite 的写事务本身是串行的（BEGIN IMMEDIATE）；PostgreSQL 的序列值在插入时分配，
+先分配的事务可能后提交，写入变更记录前会锁定变更记录表直到事务结束，使写入事务串行化。
+仪表盘记住页面渲染时的版本号，之后只拉取该版本之后变更过的用户和用户组，
+删除以墓碑形式返回，前端就地更新表格而不必重新加载整个目录。
+用户组成员数不单独记录变更，随每次同步返回的统计数据一起下发。
+
+变更记录由 demo.signals 在 save/delete/m2m_changed 时写入；update()、bulk_create
+以及直接操作用户组关系表的批量写入不会触发信号，需要在同一事务中手动调用 record_changes。
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .api.serializers import serialize_group_list, serialize_user_list
+from .events import get_broadcaster
+from .models import ChangeLogEntry
+from .stats import get_dashboard_stats
+
+USER = ChangeLogEntry.KIND_USER
+GROUP = ChangeLogEntry.KIND_GROUP
+CREATED = ChangeLogEntry.CREATED
+UPDATED = ChangeLogEntry.UPDATED
+DELETED = ChangeLogEntry.DELETED
+
+
+def record_changes(kind, object_ids, action=UPDATED, using=None):
+    """
+    记录一批对象的变更，事务提交后通知实时事件推送
+
+    参数:
+        kind (str): USER 或 GROUP
+        object_ids (iterable): 对象ID
+        action (str): CREATED、UPDATED 或 DELETED（墓碑）
+        using (str, 可选): 对象所在的数据库别名（信号的 using 参数），变更记录写入同一个库
+    """
+    entries = [ChangeLogEntry(kind=kind, object_id=object_id, action=action) for object_id in set(object_ids)]
+    if not entries:
+        return
+    using = using or router.db_for_write(ChangeLogEntry)
+    with transaction.atomic(using=using):
+        _serialize_versions(using)
+        entries = ChangeLogEntry.objects.using(using).bulk_create(entries, batch_size=500)
+    # 仪表盘和事件推送只读取主库的变更记录，其他库（如写入基准测试库）只记录不推送
+    if using == DEFAULT_DB_ALIAS:
+        events = [entry_event(entry.id, kind, entry.object_id, action) for entry in entries]
+        transaction.on_commit(lambda: get_broadcaster().publish(events), using=using)
+
+
+def _serialize_versions(using):
+    """
+    保证版本号按提交顺序分配
+
+    除 SQLite 外，在当前事务中以 SHARE ROW EXCLUSIVE 模式锁定变更记录表（与读取不冲突，
+    与其他写入者互斥），锁持有到事务提交，后写入的事务只能拿到更大的版本号且提交更晚。
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        return
+    table = connection.ops.quote_name(ChangeLogEntry._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE')
+
+
+def entry_event(version, kind, object_id, action):
+    """
+    将一条变更记录转换为推送事件
+
+    返回:
+        dict: {'type': 'user.created' 等, 'id': 对象ID, 'version': 版本号}
+    """
+    return {'type': f'{kind}.{action}', 'id': object_id, 'version': version}
+
+
+def entries_after(version, limit):
+    """读取某个版本之后的变更记录，返回 [(版本号, 类型, 对象ID, 操作), ...]"""
+    return list(
+        ChangeLogEntry.objects.filter(id__gt=version)
+        .order_by('id')
+        .values_list('id', 'kind', 'object_id', 'action')[:limit]
+    )
+
+
+def latest_version(using=None):
+    """
+    当前最新的变更版本号，没有任何变更时为 0
+
+    参数:
+        using (str, 可选): 数据库别名；页面数据从只读副本读取时应传入同一别名，
+            使版本号不超前于页面内容
+    """
+    return ChangeLogEntry.objects.using(using).aggregate(version=Max('id'))['version'] or 0
+
+
+def change_validators(kinds=(USER, GROUP), using=None):
+    """
+    获取若干类对象的最新变更版本号和时间，用作条件请求的 ETag/Last-Modified
+
+    只读取一条变更记录（按 (kind, id) 索引），不读取用户或用户组数据。
+
+    参数:
+        kinds (tuple): 参与计算的对象类型
+        using (str, 可选): 数据库别名，应与响应数据来自同一个库
+
+    返回:
+        tuple: (版本号, 变更时间)，没有变更记录时为 (0, None)
+    """
+    entries = ChangeLogEntry.objects.using(using)
+    if set(kinds) != {USER, GROUP}:
+        entries = entries.filter(kind__in=kinds)
+    latest = entries.order_by('-id').values_list('id', 'changed_at').first()
+    return latest or (0, None)
+
+
+def change_etag(name, kinds=(USER, GROUP)):
+    """
+    生成 async_condition 使用的校验值函数
+
+    参数:
+        name (str): ETag 前缀，区分不同接口
+        kinds (tuple): 接口数据依赖的对象类型
+
+    返回:
+        callable: (request, *args, **kwargs) -> (etag, last_modified)
+    """
+    def validators(request, *args, **kwargs):
+        # 在 use_read_replica 内调用时，User.objects.db 即本次请求读取的副本
+        version, changed_at = change_validators(kinds, using=User.objects.db)
+        return f'{name}-{version}', changed_at
+    return validators
+
+
+def _serialize_users(user_ids):
+    return serialize_user_list(User.objects.filter(pk__in=user_ids).order_by('username', 'id'))
+
+
+def _serialize_groups(group_ids):
+    groups = Group.objects.filter(pk__in=group_ids).annotate(member_count=Count('user', distinct=True))
+    return serialize_group_list(groups.order_by('name'))
+
+
+def collect_changes(since):
+    """
+    获取某个版本之后的变更
+
+    同一对象的多次变更合并为一次，按最后一次是否为删除决定返回当前数据还是墓碑。
+    版本号早于已清理的记录、晚于当前版本或变更条数超过 CHANGE_FEED_MAX_ENTRIES 时
+    返回 reset，客户端应重新加载完整数据。
+
+    参数:
+        since (int): 客户端已同步到的版本号
+
+    返回:
+        dict:
+            - version (int): 本次同步后的版本号
+            - reset (bool): 是否需要完整重新加载
+            - users (list): 变更后的用户（serialize_user 格式）
+            - groups (list): 变更后的用户组（serialize_group 格式）
+            - deleted (dict): {'users': [ID, ...], 'groups': [ID, ...]}
+            - stats (dict): 仪表盘统计数据（有变更时）
+    """
+    max_entries = getattr(settings, 'CHANGE_FEED_MAX_ENTRIES', 1000)
+    entries = entries_after(since, max_entries + 1)
+    oldest = ChangeLogEntry.objects.order_by('id').values_list('id', flat=True).first()
+    latest = entries[-1][0] if entries else since
+    reset = (
+        len(entries) > max_entries
+        or (oldest is not None and since < oldest - 1)
+        or (not entries and since > latest_version())
+    )
+    result = {
+        'version': latest,
+        'reset': reset,
+        'users': [],
+        'groups': [],
+        'deleted': {'users': [], 'groups': []},
+    }
+    if reset:
+        result['version'] = latest_version()
+        return result
+
+    state = {}
+    for _, kind, object_id, action in entries:
+        state[(kind, object_id)] = action
+    live = {USER: [], GROUP: []}
+    for (kind, object_id), action in state.items():
+        if action == DELETED:
+            result['deleted'][f'{kind}s'].append(object_id)
+        else:
+            live[kind].append(object_id)
+
+    if live[USER]:
+        result['users'] = _serialize_users(live[USER])
+        # 不经信号删除的对象同样作为墓碑返回
+        found = {row['id'] for row in result['users']}
+        result['deleted']['users'].extend(object_id for object_id in live[USER] if object_id not in found)
+    if live[GROUP]:
+        result['groups'] = _serialize_groups(live[GROUP])
+        found = {row['id'] for row in result['groups']}
+        result['deleted']['groups'].extend(object_id for object_id in live[GROUP] if object_id not in found)
+    if entries:
+        result['stats'] = get_dashboard_stats()
+    return result
+
+
+def prune_changes(older_than):
+    """
+    删除早于指定时间的变更记录
+
+    版本号早于剩余最早记录的客户端下次同步时会收到 reset。
+
+    参数:
+        older_than (timedelta): 保留时长
+
+    返回:
+        int: 删除的记录数
+    """
+    deleted, _ = ChangeLogEntry.objects.filter(changed_at__lt=timezone.now() - older_than).delete()
+    return deleted
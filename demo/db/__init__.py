@@ -0,0 +1,30 @@
+"""
+数据库相关工具
+
+sqlite3 子包是项目使用的 SQLite 数据库后端。
+"""
+
+import string
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def database_lower(value, using=DEFAULT_DB_ALIAS):
+    """
+    按数据库 LOWER() 的规则把字符串转换为小写
+
+    与 LOWER(列) 表达式索引中的值比较时，参数必须按同样的规则转换：
+    SQLite 内置的 LOWER() 只转换ASCII字母，其他数据库按Unicode规则转换。
+
+    参数:
+        value (str): 原始字符串
+        using (str): 数据库别名
+
+    返回:
+        str: 转换后的字符串
+    """
+    if connections[using].vendor == 'sqlite':
+        return value.translate(_ASCII_LOWER)
+    return value.lower()
@@ -0,0 +1,37 @@
+"""
+SQLite数据库后端
+
+在 Django 内置 SQLite 后端的基础上增加两个 OPTIONS:
+    - pragmas (dict): 每个新连接执行的 PRAGMA（如 journal_mode、synchronous、busy_timeout）
+    - transaction_mode (str): 事务开始方式（DEFERRED / IMMEDIATE / EXCLUSIVE）
+
+默认的 DEFERRED 事务先取读锁、写入时再升级为写锁，多个连接同时升级时 SQLite
+直接返回 "database is locked"，不会等待 busy_timeout；IMMEDIATE 在事务开始时
+就申请写锁，冲突时按 busy_timeout 排队等待。
+"""
+
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas') or {}
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = (self.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            mode = 'DEFERRED'
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,99 @@
+"""
+异步视图装饰器模块
+
+Django 4.2 的 login_required / permission_required 只支持同步视图，
+这里提供等价的异步版本（condition 同理）。request.user 是访问会话和数据库的惰性对象，
+在异步视图中需要先在线程中求值，之后才能直接读取其属性。
+"""
+
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import resolve_url
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _has_access(user, perm):
+    if not user.is_authenticated:
+        return False
+    return perm is None or user.has_perm(perm)
+
+
+async def aresolve_user(request):
+    """
+    在线程中求值 request.user
+
+    参数:
+        request (HttpRequest): 当前请求
+
+    返回:
+        User or AnonymousUser: 已求值的用户对象
+    """
+    user = request.user
+    await sync_to_async(lambda: user.is_authenticated)()
+    return user
+
+
+def async_permission_required(perm=None, login_url=None):
+    """
+    异步视图的登录与权限检查，未登录或缺少权限时重定向到登录页
+
+    参数:
+        perm (str, 可选): 需要的权限，为 None 时只要求已登录
+        login_url (str, 可选): 登录页URL或URL名称，默认 settings.LOGIN_URL
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if await sync_to_async(_has_access)(request.user, perm):
+                return await view_func(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url or settings.LOGIN_URL))
+        return _wrapped_view
+    return decorator
+
+
+def async_login_required(login_url=None):
+    """异步视图的登录检查"""
+    return async_permission_required(None, login_url)
+
+
+def async_condition(validators):
+    """
+    异步视图的条件请求处理，对应 django.views.decorators.http.condition
+
+    先计算校验值，与 If-None-Match/If-Modified-Since 匹配时直接返回304，不执行视图；
+    否则执行视图并附加 ETag/Last-Modified。响应标记为 private, no-cache，
+    浏览器每次都带校验值重新验证，不会按 Last-Modified 启发式地使用过期数据。
+
+    参数:
+        validators (callable): (request, *args, **kwargs) -> (etag, last_modified)，
+            通常由同一次查询得到，可以是协程函数；etag 为 None 时不做条件处理
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view_func(request, *args, **kwargs)
+            if iscoroutinefunction(validators):
+                etag, last_modified = await validators(request, *args, **kwargs)
+            else:
+                etag, last_modified = await sync_to_async(validators)(request, *args, **kwargs)
+            if etag is None:
+                return await view_func(request, *args, **kwargs)
+            etag = quote_etag(etag)
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,200 @@
+"""
+实时事件推送模块
+
+用户/用户组的创建、更新、删除在事务提交后作为事件广播给 /events/ 上的 SSE 连接，
+仪表盘收到事件后通过增量刷新接口拉取变化的数据，不再轮询。
+
+Broadcaster 是进程内的订阅者集合，事件来源由 EVENTS_BACKEND 指定的后端提供：
+    - LocalEventBackend: 只转发本进程内产生的事件，适合单进程部署和测试
+    - ChangeLogEventBackend: 每个进程一个后台任务轮询变更记录表，多个工作进程
+      （包括处理写请求的 WSGI 进程）通过数据库共享事件，作为外部消息队列的本地替代
+
+自定义后端继承 BaseEventBackend，实现 publish 和/或 run。
+"""
+
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .logger import logger
+
+
+class BaseEventBackend:
+    """事件后端基类"""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def publish(self, events):
+        """
+        事务提交后调用，可能在任意线程中执行
+
+        参数:
+            events (list): changefeed.entry_event 生成的事件
+        """
+
+    async def run(self):
+        """有订阅者时在事件循环中运行，没有订阅者时被取消"""
+        await asyncio.Event().wait()
+
+
+class LocalEventBackend(BaseEventBackend):
+    """直接转发本进程内发布的事件"""
+
+    def publish(self, events):
+        self.broadcaster.dispatch(events)
+
+
+class ChangeLogEventBackend(BaseEventBackend):
+    """轮询变更记录表，把其他进程写入的变更也转换为事件"""
+
+    async def run(self):
+        from .changefeed import entries_after, entry_event, latest_version
+
+        interval = getattr(settings, 'EVENTS_POLL_INTERVAL', 1.0)
+        batch_size = getattr(settings, 'CHANGE_FEED_MAX_ENTRIES', 1000)
+        version = await sync_to_async(latest_version)()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                entries = await sync_to_async(entries_after)(version, batch_size)
+            except Exception as e:
+                # 数据库暂时不可用时继续轮询，不中断已连接的客户端
+                logger.warning(f"读取变更记录失败: {e}")
+                continue
+            if entries:
+                version = entries[-1][0]
+                self.broadcaster.dispatch([entry_event(*entry) for entry in entries])
+
+
+class Broadcaster:
+    """
+    进程内事件广播器
+
+    每个订阅者拥有一个有界队列，队列已满时丢弃新事件（事件只用于触发增量刷新，
+    客户端收到后续任一事件都会补齐变化）。后端任务随第一个订阅者启动，最后一个订阅者离开时停止。
+    """
+
+    def __init__(self, backend_class):
+        self.backend = backend_class(self)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._task = None
+
+    def publish(self, events):
+        self.backend.publish(events)
+
+    def dispatch(self, events):
+        """把事件放入所有订阅者的队列，可在任意线程中调用"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            for event in events:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def subscribe(self):
+        """
+        订阅事件
+
+        返回:
+            asyncio.Queue: 事件队列，使用完毕后必须调用 unsubscribe
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=getattr(settings, 'EVENTS_QUEUE_SIZE', 100))
+        with self._lock:
+            self._subscribers.add((loop, queue))
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self.backend.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {item for item in self._subscribers if item[1] is not queue}
+            idle = not self._subscribers
+        if idle and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    """获取本进程的广播器，后端类由 EVENTS_BACKEND 指定"""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                backend = getattr(settings, 'EVENTS_BACKEND', 'demo.events.ChangeLogEventBackend')
+                _broadcaster = Broadcaster(import_string(backend))
+    return _broadcaster
+
+
+def reset_broadcaster():
+    """丢弃当前广播器（修改 EVENTS_BACKEND 后使用，主要用于测试）"""
+    global _broadcaster
+    with _broadcaster_lock:
+        _broadcaster = None
+
+
+def format_event(event):
+    """
+    编码为一条SSE消息
+
+    参数:
+        event (dict): {'type', 'id', 'version'}
+
+    返回:
+        bytes: 以空行结尾的SSE消息
+    """
+    data = json.dumps(event, separators=(',', ':'))
+    return f"id: {event['version']}\nevent: {event['type']}\ndata: {data}\n\n".encode()
+
+
+async def event_stream(max_age=None, heartbeat=None):
+    """
+    SSE 消息流，定期发送注释行保活
+
+    Django 4.2 在客户端断开后不会停止异步流式响应，因此每个连接最多保持 max_age 秒，
+    之后结束响应由 EventSource 自动重连，避免断开的连接一直占用订阅。
+
+    参数:
+        max_age (float, 可选): 连接最长秒数，默认 EVENTS_MAX_AGE
+        heartbeat (float, 可选): 保活间隔秒数，默认 EVENTS_HEARTBEAT
+    """
+    max_age = getattr(settings, 'EVENTS_MAX_AGE', 300) if max_age is None else max_age
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT', 15) if heartbeat is None else heartbeat
+    broadcaster = get_broadcaster()
+    queue = broadcaster.subscribe()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    try:
+        yield f"retry: {int(getattr(settings, 'EVENTS_RETRY_MS', 3000))}\n\n".encode()
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield b': ping\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,68 @@
+"""
+可调参数的密码哈希器
+
+在Django内置哈希器的基础上，从配置读取计算成本参数：
+    - PASSWORD_PBKDF2_ITERATIONS: PBKDF2迭代次数
+    - PASSWORD_SCRYPT_WORK_FACTOR / PASSWORD_SCRYPT_BLOCK_SIZE / PASSWORD_SCRYPT_PARALLELISM: scrypt参数
+    - PASSWORD_ARGON2_TIME_COST / PASSWORD_ARGON2_MEMORY_COST / PASSWORD_ARGON2_PARALLELISM: Argon2参数（需要 argon2-cffi）
+
+未配置的参数使用Django默认值。算法名称与内置哈希器相同，已有哈希可以继续校验；
+参数变化后 must_update 返回 True，用户下次登录时由认证后端自动重新哈希。
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+def _setting(name, default):
+    value = getattr(settings, name, None)
+    return default if value is None else value
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """迭代次数由 PASSWORD_PBKDF2_ITERATIONS 配置"""
+
+    @property
+    def iterations(self):
+        return _setting('PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt参数由 PASSWORD_SCRYPT_* 配置"""
+
+    @property
+    def work_factor(self):
+        return _setting('PASSWORD_SCRYPT_WORK_FACTOR', ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return _setting('PASSWORD_SCRYPT_BLOCK_SIZE', ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return _setting('PASSWORD_SCRYPT_PARALLELISM', ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # 默认的 maxmem=0 即OpenSSL的32MB上限，调大 work_factor 后不够用
+        return max(64 * 1024 * 1024, 256 * self.work_factor * self.block_size * self.parallelism)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2参数由 PASSWORD_ARGON2_* 配置（memory_cost 单位为KiB）"""
+
+    @property
+    def time_cost(self):
+        return _setting('PASSWORD_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return _setting('PASSWORD_ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return _setting('PASSWORD_ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
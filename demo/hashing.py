@@ -0,0 +1,209 @@
+"""
+密码哈希模块
+
+将 PBKDF2 等CPU密集的密码哈希放到进程池中执行，避免阻塞请求线程。
+进程数由 PASSWORD_HASHING_WORKERS 配置，为 0 时在当前进程内计算。每个Web工作进程各自
+创建进程池，未配置时默认为 CPU核数 // WEB_CONCURRENCY（至少1），使所有工作进程的
+哈希进程合计不超过CPU核数。
+
+单个请求的哈希任务（登录校验、注册、修改密码）受有界队列限制：
+进行中的任务数达到 PASSWORD_HASHING_QUEUE_SIZE 时，新任务等待
+PASSWORD_HASHING_QUEUE_TIMEOUT 秒后仍无空位则抛出 HashingBusy，
+由视图返回 503，而不是让请求继续堆积。等待结果超过
+PASSWORD_HASHING_RESULT_TIMEOUT 秒同样抛出 HashingBusy。
+
+批量哈希（批量导入）按 PASSWORD_HASHING_CHUNK_SIZE 分块提交，也占用同一个有界队列，
+且同时在途的块数不超过进程数，登录等单个请求最多排在一个块之后。
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+
+
+class HashingBusy(Exception):
+    """密码哈希队列已满"""
+
+    retry_after = 1
+
+
+def _init_worker(settings_module):
+    """子进程初始化：以spawn方式启动时需要重新加载Django配置"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _check_and_rehash(password, encoded):
+    """
+    在子进程中校验密码，需要升级哈希时一并计算新哈希
+
+    返回:
+        tuple: (是否正确, 新哈希或None)
+    """
+    upgraded = []
+    is_correct = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return is_correct, (upgraded[0] if upgraded else None)
+
+
+def hashing_workers():
+    """本进程的进程池大小，默认按Web工作进程数均分CPU核数"""
+    workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None)
+    if workers is None:
+        concurrency = max(1, int(getattr(settings, 'WEB_CONCURRENCY', 1)))
+        workers = max(1, (os.cpu_count() or 1) // concurrency)
+    return max(0, int(workers))
+
+
+def hashing_queue_size():
+    """允许同时进行（排队+执行）的哈希任务数，默认为进程数的4倍"""
+    size = getattr(settings, 'PASSWORD_HASHING_QUEUE_SIZE', None)
+    if size is None:
+        size = hashing_workers() * 4
+    return max(1, int(size))
+
+
+def get_hashing_executor():
+    """
+    获取（并在首次调用时创建）密码哈希进程池
+
+    返回:
+        ProcessPoolExecutor or None: 配置为 0 个进程时返回 None
+    """
+    global _executor, _slots
+    workers = hashing_workers()
+    if workers == 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(hashing_queue_size())
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'DjangoProject.settings'),),
+                )
+    return _executor
+
+
+def _reset_executor():
+    """进程池损坏（子进程被杀死等）时丢弃，下次调用重新创建"""
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def _submit(executor, func, args, queue_timeout):
+    """
+    占用有界队列的一个位置并提交任务，任务结束时释放
+
+    参数:
+        queue_timeout (float or None): 等待空位的秒数，None 表示一直等待
+
+    返回:
+        Future or None: 进程池不可用时返回 None，由调用方在当前进程内计算
+
+    异常:
+        HashingBusy: 等待超时仍无空位
+    """
+    slots = _slots
+    acquired = slots.acquire() if queue_timeout is None else slots.acquire(timeout=queue_timeout)
+    if not acquired:
+        raise HashingBusy('密码哈希队列已满')
+    try:
+        future = executor.submit(func, *args)
+    except (BrokenProcessPool, RuntimeError):
+        slots.release()
+        _reset_executor()
+        return None
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _result(future, func, args):
+    """等待任务结果，最多 PASSWORD_HASHING_RESULT_TIMEOUT 秒"""
+    if future is None:
+        return func(*args)
+    try:
+        return future.result(timeout=getattr(settings, 'PASSWORD_HASHING_RESULT_TIMEOUT', 10))
+    except FutureTimeoutError:
+        raise HashingBusy('密码哈希等待超时')
+    except BrokenProcessPool:
+        _reset_executor()
+        return func(*args)
+
+
+def _run(func, *args):
+    """在进程池中执行一个哈希任务并等待结果，受有界队列限制"""
+    executor = get_hashing_executor()
+    if executor is None:
+        return func(*args)
+    future = _submit(executor, func, args, getattr(settings, 'PASSWORD_HASHING_QUEUE_TIMEOUT', 0.5))
+    return _result(future, func, args)
+
+
+def hash_password(password):
+    """在进程池中计算单个密码哈希"""
+    return _run(make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    在进程池中校验密码
+
+    返回:
+        tuple: (是否正确, 需要升级时的新哈希或None)
+    """
+    return _run(_check_and_rehash, password, encoded)
+
+
+def set_password(user, raw_password):
+    """与 User.set_password 相同，但哈希在进程池中计算"""
+    user.password = hash_password(raw_password)
+    user._password = raw_password
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords):
+    """
+    批量计算密码哈希（批量导入使用）
+
+    分块提交到进程池，每块占用有界队列的一个位置；在途块数不超过进程数，
+    队列已满时等待空位而不是抛出 HashingBusy。
+
+    参数:
+        passwords (list): 明文密码列表
+
+    返回:
+        list: 与输入顺序一致的哈希结果
+
+    异常:
+        HashingBusy: 某一块等待结果超过 PASSWORD_HASHING_RESULT_TIMEOUT 秒
+    """
+    passwords = list(passwords)
+    executor = get_hashing_executor()
+    if executor is None or len(passwords) < 2:
+        return _hash_chunk(passwords)
+    size = max(1, int(getattr(settings, 'PASSWORD_HASHING_CHUNK_SIZE', 8)))
+    in_flight = deque()
+    hashes = []
+    for start in range(0, len(passwords), size):
+        if len(in_flight) >= hashing_workers():
+            hashes.extend(_result(*in_flight.popleft()))
+        chunk = passwords[start:start + size]
+        in_flight.append((_submit(executor, _hash_chunk, (chunk,), None), _hash_chunk, (chunk,)))
+    while in_flight:
+        hashes.extend(_result(*in_flight.popleft()))
+    return hashes
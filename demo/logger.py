@@ -1,6 +1,8 @@
 from loguru import logger
 import sys
 import os
+from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
 # 创建logs目录（如果不存在）
@@ -29,6 +31,25 @@ logger.add(
     enqueue=True,  # 异步写入
 )
 
+# 日志类别，由日志函数通过 extra["category"] 传递，处理器按字段路由而不扫描消息文本
+CATEGORY_SECURITY = "security"
+CATEGORY_AUDIT = "audit"
+CATEGORY_OPERATION = "operation"
+ALL_CATEGORIES = frozenset({CATEGORY_SECURITY, CATEGORY_AUDIT, CATEGORY_OPERATION})
+
+
+def _category_filter(*categories):
+    """生成按 extra["category"] 路由的过滤器"""
+    accepted = frozenset(categories)
+    return lambda record: record["extra"].get("category") in accepted
+
+
+# 各处理器接受的 (最低级别, 类别集合)，用于在格式化消息前判断是否有处理器需要该记录
+_SINK_ROUTES = [
+    (logger.level("INFO").no, ALL_CATEGORIES),   # 控制台
+    (logger.level("DEBUG").no, ALL_CATEGORIES),  # django.log
+]
+
 # 添加安全日志处理器（专门记录安全相关操作）
 logger.add(
     LOGS_DIR / "security.log",
@@ -38,13 +59,9 @@ logger.add(
     level="INFO",  # 记录INFO级别以上的安全日志
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | SECURITY | {name}:{function}:{line} - {message}",
     enqueue=True,
-    filter=lambda record: "SECURITY" in record["message"] or
-                         "登录" in record["message"] or
-                         "权限" in record["message"] or
-                         "初始化" in record["message"] or
-                         "删除" in record["message"] or
-                         "密码" in record["message"],
+    filter=_category_filter(CATEGORY_SECURITY),
 )
+_SINK_ROUTES.append((logger.level("INFO").no, frozenset({CATEGORY_SECURITY})))
 
 # 添加审计日志处理器（记录重要操作）
 logger.add(
@@ -55,11 +72,9 @@ logger.add(
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | AUDIT | {extra[context]} - {message}",
     enqueue=True,
-    filter=lambda record: "AUDIT" in record["message"] or
-                         "创建成功" in record["message"] or
-                         "更新成功" in record["message"] or
-                         "删除成功" in record["message"],
+    filter=_category_filter(CATEGORY_AUDIT),
 )
+_SINK_ROUTES.append((logger.level("INFO").no, frozenset({CATEGORY_AUDIT})))
 
 # 添加错误日志处理器
 logger.add(
@@ -70,6 +85,66 @@ logger.add(
     backtrace=True,  # 错误回溯
     diagnose=True,  # 详细诊断信息
 )
+_SINK_ROUTES.append((logger.level("ERROR").no, ALL_CATEGORIES))
+
+# 每个类别被任一处理器接受的最低级别
+_CATEGORY_MIN_LEVEL = {
+    category: min(level_no for level_no, categories in _SINK_ROUTES if category in categories)
+    for category in ALL_CATEGORIES
+}
+
+
+class _RequestLogBuffer:
+    """单个请求内收集的日志条目"""
+
+    __slots__ = ("entries", "immediate_categories")
+
+    def __init__(self, immediate_categories=()):
+        self.entries = []
+        self.immediate_categories = frozenset(immediate_categories)
+
+
+# 当前请求的日志缓冲区，为 None 时直接写入
+_request_log_buffer = ContextVar("request_log_buffer", default=None)
+
+
+def _resolve_level(level):
+    """将级别名称转换为 (名称, 数值)，未知级别按 INFO 处理"""
+    name = level.upper()
+    try:
+        return name, logger.level(name).no
+    except ValueError:
+        return "INFO", logger.level("INFO").no
+
+
+def _emit(category, level, message, request=None, prefix="", **extra):
+    """
+    结构化写入一条日志
+
+    类别和客户端信息作为 extra 字段传递；没有处理器接受该类别和级别时，
+    直接返回，不解析客户端信息也不拼接消息。
+    """
+    level_name, level_no = _resolve_level(level)
+    if level_no < _CATEGORY_MIN_LEVEL[category]:
+        return
+    buffer = _request_log_buffer.get()
+    if buffer is not None and category not in buffer.immediate_categories:
+        buffer.entries.append((category, level_name, level_no, message, extra))
+        return
+    if request:
+        client_info, client = get_client_descriptor(request)
+        log_message = f"{prefix}{client} {message}"
+    else:
+        client_info = {}
+        client = ""
+        log_message = f"{prefix}{message}"
+    logger.bind(
+        category=category,
+        client=client,
+        ip=client_info.get("ip"),
+        **extra
+    ).opt(depth=2).log(level_name, log_message)
+
 
 def get_client_info(request):
     """
@@ -96,6 +171,50 @@ def get_client_info(request):
         'user_agent': user_agent
     }
 
+@lru_cache(maxsize=1024)
+def classify_user_agent(user_agent):
+    """
+    将User-Agent归类为“浏览器/操作系统”，结果在进程内按User-Agent字符串缓存
+    
+    Args:
+        user_agent (str): 原始User-Agent
+        
+    Returns:
+        str: 例如 "Chrome/Windows"，未知时为 "unknown"
+    """
+    if user_agent == 'unknown':
+        return 'unknown'
+
+    # 提取浏览器名称和版本
+    if 'Chrome' in user_agent and 'Edg' in user_agent:
+        browser = 'Edge'
+    elif 'Chrome' in user_agent:
+        browser = 'Chrome'
+    elif 'Firefox' in user_agent:
+        browser = 'Firefox'
+    elif 'Safari' in user_agent:
+        browser = 'Safari'
+    elif 'Edge' in user_agent:
+        browser = 'Edge'
+    else:
+        browser = 'Other'
+    
+    # 提取操作系统信息
+    if 'Windows' in user_agent:
+        os_info = 'Windows'
+    elif 'Mac' in user_agent:
+        os_info = 'Mac'
+    elif 'Linux' in user_agent:
+        os_info = 'Linux'
+    elif 'Android' in user_agent:
+        os_info = 'Android'
+    elif 'iPhone' in user_agent or 'iPad' in user_agent:
+        os_info = 'iOS'
+    else:
+        os_info = 'Other'
+    
+    return f"{browser}/{os_info}"
+
 def format_client_info(client_info):
     """
     格式化客户端信息用于日志记录
@@ -108,85 +227,84 @@ def format_client_info(client_info):
     """
     ip = client_info.get('ip', 'unknown')
     user_agent = client_info.get('user_agent', 'unknown')
+    return f"[IP:{ip}|Browser:{classify_user_agent(user_agent)}]"
+
+def get_client_descriptor(request):
+    """
+    获取请求的客户端信息及其格式化字符串，每个请求只计算一次
     
-    # 简化浏览器标识，只保留关键信息
-    if user_agent != 'unknown':
-        # 提取浏览器名称和版本
-        if 'Chrome' in user_agent and 'Edg' in user_agent:
-            browser = 'Edge'
-        elif 'Chrome' in user_agent:
-            browser = 'Chrome'
-        elif 'Firefox' in user_agent:
-            browser = 'Firefox'
-        elif 'Safari' in user_agent:
-            browser = 'Safari'
-        elif 'Edge' in user_agent:
-            browser = 'Edge'
-        else:
-            browser = 'Other'
+    Args:
+        request: Django请求对象
         
-        # 提取操作系统信息
-        if 'Windows' in user_agent:
-            os_info = 'Windows'
-        elif 'Mac' in user_agent:
-            os_info = 'Mac'
-        elif 'Linux' in user_agent:
-            os_info = 'Linux'
-        elif 'Android' in user_agent:
-            os_info = 'Android'
-        elif 'iPhone' in user_agent or 'iPad' in user_agent:
-            os_info = 'iOS'
-        else:
-            os_info = 'Other'
+    Returns:
+        tuple: (get_client_info 的结果, format_client_info 的结果)
+    """
+    descriptor = getattr(request, '_client_descriptor', None)
+    if descriptor is None:
+        client_info = get_client_info(request)
+        descriptor = (client_info, format_client_info(client_info))
+        request._client_descriptor = descriptor
+    return descriptor
+
+def start_request_log_buffer(immediate_categories=(CATEGORY_SECURITY,)):
+    """
+    开始缓冲当前请求的日志
+    
+    Args:
+        immediate_categories: 不缓冲、仍然立即写入的日志类别
         
-        user_agent_info = f"{browser}/{os_info}"
-    else:
-        user_agent_info = 'unknown'
+    Returns:
+        Token: 传给 flush_request_log_buffer 的上下文令牌
+    """
+    return _request_log_buffer.set(_RequestLogBuffer(immediate_categories))
+
+def flush_request_log_buffer(token, request=None):
+    """
+    结束缓冲并按类别将请求内的日志合并为一条记录写入
     
-    return f"[IP:{ip}|Browser:{user_agent_info}]"
+    Args:
+        token: start_request_log_buffer 返回的令牌
+        request: Django请求对象，用于记录客户端信息和请求路径
+    """
+    buffer = _request_log_buffer.get()
+    _request_log_buffer.reset(token)
+    if buffer is None or not buffer.entries:
+        return
+
+    if request is not None:
+        client_info, client = get_client_descriptor(request)
+        header = f"{client} {request.method} {request.path}"
+    else:
+        client_info, client = {}, ""
+        header = "-"
+
+    prefixes = {CATEGORY_SECURITY: "SECURITY: ", CATEGORY_AUDIT: "AUDIT: ", CATEGORY_OPERATION: ""}
+    for category, prefix in prefixes.items():
+        entries = [entry for entry in buffer.entries if entry[0] == category]
+        if not entries:
+            continue
+        level_name = max(entries, key=lambda entry: entry[2])[1]
+        extra = {}
+        for entry in entries:
+            extra.update(entry[4])
+        lines = "\n".join(f"    [{entry[1]}] {entry[3]}" for entry in entries)
+        logger.bind(
+            category=category,
+            client=client,
+            ip=client_info.get("ip"),
+            batched=len(entries),
+            **extra
+        ).log(level_name, f"{prefix}{header} ({len(entries)} 条)\n{lines}")
 
 # 创建专用的日志函数
 def log_security(message: str, request=None, level: str = "INFO"):
     """记录安全相关日志"""
-    if request:
-        client_info = get_client_info(request)
-        client_info_str = format_client_info(client_info)
-        log_message = f"SECURITY: {client_info_str} {message}"
-    else:
-        log_message = f"SECURITY: {message}"
-    
-    if level.upper() == "WARNING":
-        logger.warning(log_message)
-    elif level.upper() == "ERROR":
-        logger.error(log_message)
-    else:
-        logger.info(log_message)
+    _emit(CATEGORY_SECURITY, level, message, request, prefix="SECURITY: ")
 
 def log_audit(message: str, request=None, context: str = "system", level: str = "INFO"):
     """记录审计日志"""
-    if request:
-        client_info = get_client_info(request)
-        client_info_str = format_client_info(client_info)
-        log_message = f"AUDIT: {client_info_str} {message}"
-    else:
-        log_message = f"AUDIT: {message}"
-    
-    logger.bind(context=context).info(log_message)
+    _emit(CATEGORY_AUDIT, level, message, request, prefix="AUDIT: ", context=context)
 
 def log_operation(message: str, request=None, level: str = "INFO"):
     """记录一般操作日志"""
-    if request:
-        client_info = get_client_info(request)
-        client_info_str = format_client_info(client_info)
-        log_message = f"{client_info_str} {message}"
-    else:
-        log_message = message
-    
-    if level.upper() == "DEBUG":
-        logger.debug(log_message)
-    elif level.upper() == "WARNING":
-        logger.warning(log_message)
-    elif level.upper() == "ERROR":
-        logger.error(log_message)
-    else:
-        logger.info(log_message)
\ No newline at end of file
+    _emit(CATEGORY_OPERATION, level, message, request)
@@ -0,0 +1,261 @@
+"""
+接口基准测试命令
+
+在独立的测试数据库中批量生成用户和用户组，然后通过Django测试客户端
+分别以超级管理员和普通用户身份请求 demo 的各个接口，统计延迟分位数、
+每个请求的查询次数和峰值内存，可输出JSON便于在不同提交之间对比。
+
+用法:
+    python manage.py benchmark --users 10000 --groups 20 --requests 30 --output bench.json
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+# 与 init_system 一致的角色权限
+ROLE_PERMISSIONS = {
+    '超级管理员': None,  # 用户和用户组的全部权限
+    '管理员': ['add_user', 'change_user', 'delete_user', 'view_user', 'view_group'],
+    '普通用户': ['view_user', 'view_group'],
+}
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def seed_directory(user_count, group_count, batch_size=2000):
+    """
+    批量生成基准测试数据
+
+    参数:
+        user_count (int): 普通账号数量
+        group_count (int): 额外用户组数量（不含三个默认角色）
+        batch_size (int): bulk_create 批大小
+
+    返回:
+        dict: {'admin': 超级管理员, 'member': 普通用户, 'roles': {名称: Group}, 'groups': [额外用户组]}
+    """
+    user_ct = ContentType.objects.get_for_model(User)
+    group_ct = ContentType.objects.get_for_model(Group)
+    all_permissions = Permission.objects.filter(content_type__in=[user_ct, group_ct])
+
+    roles = {}
+    for name, codenames in ROLE_PERMISSIONS.items():
+        group = Group.objects.create(name=name)
+        if codenames is None:
+            group.permissions.set(all_permissions)
+        else:
+            group.permissions.set(all_permissions.filter(codename__in=codenames))
+        roles[name] = group
+
+    extra_groups = Group.objects.bulk_create(
+        [Group(name=f'bench-group-{i:04d}') for i in range(group_count)]
+    )
+
+    # 所有账号共用一个预先计算的密码哈希，避免生成数据时逐个哈希
+    password_hash = make_password(BENCH_PASSWORD)
+    admin = User.objects.create(
+        username='bench-admin', password=password_hash, is_staff=True, is_superuser=True
+    )
+    member = User.objects.create(username='bench-member', password=password_hash)
+    admin.groups.add(roles['超级管理员'])
+    member.groups.add(roles['普通用户'])
+
+    users = User.objects.bulk_create(
+        [
+            User(username=f'bench-user-{i:07d}', email=f'user{i}@example.com',
+                 password=password_hash, is_active=i % 10 != 0)
+            for i in range(user_count)
+        ],
+        batch_size=batch_size,
+    )
+    targets = [roles['普通用户']] + list(extra_groups)
+    Membership = User.groups.through
+    Membership.objects.bulk_create(
+        [Membership(user_id=user.id, group_id=targets[i % len(targets)].id) for i, user in enumerate(users)],
+        batch_size=batch_size,
+    )
+    return {'admin': admin, 'member': member, 'roles': roles, 'groups': extra_groups}
+
+
+def build_scenarios(seed):
+    """
+    生成要测试的接口列表
+
+    返回:
+        list: [(名称, 方法, URL, 请求体或None), ...]
+    """
+    roles = seed['roles']
+    member_group = roles['普通用户']
+    sample_user = User.objects.filter(groups=member_group).exclude(pk=seed['member'].pk).order_by('id').first()
+    counter = {'create': 0}
+
+    def create_payload():
+        counter['create'] += 1
+        return {'username': f'bench-created-{counter["create"]:06d}', 'password': BENCH_PASSWORD,
+                'group_id': member_group.id}
+
+    return [
+        ('home', 'get', reverse('demo:home'), None),
+        ('users_api', 'get', reverse('demo:users_api'), None),
+        ('users_api_page', 'get', reverse('demo:users_api') + '?limit=50', None),
+        ('user_detail_json', 'get', reverse('demo:user_detail', args=[sample_user.id]) + '?format=json', None),
+        ('group_list', 'get', reverse('demo:group_list'), None),
+        ('group_detail_api', 'get', reverse('demo:group_detail_api', args=[member_group.id]), None),
+        ('group_members', 'get', reverse('demo:group_members', args=[member_group.id]), None),
+        ('available_users_for_group', 'get',
+         reverse('demo:available_users_for_group', args=[roles['管理员'].id]), None),
+        ('check_username', 'get', reverse('demo:check_username') + '?username=bench_new_name', None),
+        ('user_update', 'post', reverse('demo:user_update', args=[sample_user.id]),
+         lambda: {'username': sample_user.username, 'email': sample_user.email,
+                  'group_id': member_group.id, 'is_active': True}),
+        ('change_user_group', 'post', reverse('demo:change_user_group', args=[sample_user.id]),
+         lambda: {'group_id': member_group.id}),
+        ('user_create', 'post', reverse('demo:user_create'), create_payload),
+    ]
+
+
+def _consume(response):
+    """读取完整响应体（包括流式响应），返回字节数"""
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_scenario(client, method, url, payload, iterations, warmup):
+    """
+    重复请求一个接口并汇总结果
+
+    返回:
+        dict: 延迟分位数（毫秒）、每个请求的查询次数、峰值内存（KB）、状态码和响应大小
+    """
+    def send():
+        if method == 'post':
+            body = json.dumps(payload() if callable(payload) else payload)
+            return client.post(url, data=body, content_type='application/json')
+        return client.get(url)
+
+    for _ in range(warmup):
+        _consume(send())
+
+    latencies = []
+    queries = []
+    status = None
+    size = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = send()
+            size = _consume(response)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+        status = response.status_code
+
+    # 单独测量一次峰值内存，避免 tracemalloc 影响延迟统计
+    tracemalloc.start()
+    _consume(send())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'status': status,
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': size,
+    }
+
+
+class Command(BaseCommand):
+    help = '在临时测试数据库中生成数据并测试 demo 各接口的延迟、查询次数和内存'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='生成的用户数量')
+        parser.add_argument('--groups', type=int, default=10, help='额外生成的用户组数量')
+        parser.add_argument('--requests', type=int, default=20, help='每个接口的测量请求次数')
+        parser.add_argument('--warmup', type=int, default=2, help='每个接口的预热请求次数')
+        parser.add_argument('--only', nargs='*', default=None, help='只测试指定名称的接口')
+        parser.add_argument('--output', default=None, help='将结果以JSON写入该文件')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self.run_benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['output']}"))
+
+    def run_benchmark(self, options):
+        started = time.perf_counter()
+        seed = seed_directory(options['users'], options['groups'])
+        seed_seconds = time.perf_counter() - started
+        self.stdout.write(f"已生成 {options['users']} 个用户、{options['groups']} 个用户组，用时 {seed_seconds:.2f}s")
+
+        scenarios = build_scenarios(seed)
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if scenario[0] in options['only']]
+
+        results = {}
+        for role, account in (('admin', seed['admin']), ('member', seed['member'])):
+            client = Client()
+            client.force_login(account)
+            results[role] = {}
+            for name, method, url, payload in scenarios:
+                results[role][name] = run_scenario(
+                    client, method, url, payload, options['requests'], options['warmup']
+                )
+
+        return {
+            'meta': {
+                'users': options['users'],
+                'groups': options['groups'],
+                'requests': options['requests'],
+                'database': connections['default'].vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'seed_seconds': round(seed_seconds, 3),
+            },
+            'results': results,
+        }
+
+    def print_report(self, report):
+        header = f"{'role':<8} {'endpoint':<28} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'peak KB':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for role, endpoints in report['results'].items():
+            for name, row in endpoints.items():
+                self.stdout.write(
+                    f"{role:<8} {name:<28} {row['status']:>6} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                    f"{row['queries_per_request']:>8} {row['peak_memory_kb']:>9.1f}"
+                )
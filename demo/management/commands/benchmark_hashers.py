@@ -0,0 +1,151 @@
+"""
+密码哈希成本基准测试命令
+
+按当前配置的成本参数测量各哈希方案的单次哈希耗时（单核）以及多进程并行时的总吞吐，
+用于估算登录接口的CPU上限，并可根据目标耗时给出建议参数。
+
+用法:
+    python manage.py benchmark_hashers --profiles pbkdf2 scrypt --rounds 20 --target-ms 100
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from demo.hashing import _init_worker
+
+PROFILES = {
+    'pbkdf2': 'demo.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'demo.hashers.TunedScryptPasswordHasher',
+    'argon2': 'demo.hashers.TunedArgon2PasswordHasher',
+}
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def _time_hashes(hasher_path, rounds):
+    """计算 rounds 次哈希，返回耗时（秒）；在子进程中同样可用"""
+    hasher = import_string(hasher_path)()
+    salt = hasher.salt()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        hasher.encode(BENCH_PASSWORD, salt)
+    return time.perf_counter() - started
+
+
+def cost_parameters(hasher):
+    """当前生效的成本参数"""
+    if hasher.algorithm == 'pbkdf2_sha256':
+        return {'PASSWORD_PBKDF2_ITERATIONS': hasher.iterations}
+    if hasher.algorithm == 'scrypt':
+        return {
+            'PASSWORD_SCRYPT_WORK_FACTOR': hasher.work_factor,
+            'PASSWORD_SCRYPT_BLOCK_SIZE': hasher.block_size,
+            'PASSWORD_SCRYPT_PARALLELISM': hasher.parallelism,
+        }
+    return {
+        'PASSWORD_ARGON2_TIME_COST': hasher.time_cost,
+        'PASSWORD_ARGON2_MEMORY_COST': hasher.memory_cost,
+        'PASSWORD_ARGON2_PARALLELISM': hasher.parallelism,
+    }
+
+
+def suggest_parameters(hasher, ms_per_hash, target_ms):
+    """
+    按耗时与成本参数近似成正比，估算达到目标耗时的参数
+
+    返回:
+        dict: {配置名: 建议值}
+    """
+    ratio = target_ms / ms_per_hash
+    if hasher.algorithm == 'pbkdf2_sha256':
+        return {'PASSWORD_PBKDF2_ITERATIONS': max(1000, int(round(hasher.iterations * ratio, -3)))}
+    if hasher.algorithm == 'scrypt':
+        # work_factor 必须是2的幂
+        work_factor = 1 << max(10, int(hasher.work_factor * ratio).bit_length() - 1)
+        return {'PASSWORD_SCRYPT_WORK_FACTOR': work_factor}
+    return {'PASSWORD_ARGON2_TIME_COST': max(1, int(round(hasher.time_cost * ratio)))}
+
+
+class Command(BaseCommand):
+    help = '测量各密码哈希方案的单核哈希耗时和多进程吞吐，并给出建议的成本参数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='*', choices=sorted(PROFILES), default=None,
+                            help='要测试的方案，默认测试当前配置的方案')
+        parser.add_argument('--rounds', type=int, default=10, help='每个进程计算的哈希次数')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行测试的进程数，0表示跳过')
+        parser.add_argument('--target-ms', type=float, default=None, help='单次哈希的目标耗时（毫秒）')
+        parser.add_argument('--output', default=None, help='将结果以JSON写入该文件')
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or [getattr(settings, 'PASSWORD_HASHER_PROFILE', 'pbkdf2')]
+        report = {'meta': {'cpu_count': os.cpu_count(), 'workers': options['workers'],
+                           'rounds': options['rounds']}, 'results': {}}
+
+        for profile in profiles:
+            result = self.measure(profile, options)
+            if result is not None:
+                report['results'][profile] = result
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['output']}"))
+
+    def measure(self, profile, options):
+        path = PROFILES[profile]
+        hasher = import_string(path)()
+        try:
+            # 预热一次，同时检查可选依赖（如 argon2-cffi）是否可用
+            hasher.encode(BENCH_PASSWORD, hasher.salt())
+        except ValueError as e:
+            self.stderr.write(self.style.WARNING(f'跳过 {profile}: {e}'))
+            return None
+
+        rounds = options['rounds']
+        ms_per_hash = _time_hashes(path, rounds) * 1000 / rounds
+        result = {
+            'parameters': cost_parameters(hasher),
+            'ms_per_hash': round(ms_per_hash, 3),
+            'hashes_per_second_per_core': round(1000 / ms_per_hash, 2),
+        }
+
+        workers = options['workers']
+        if workers > 0:
+            # 每个进程同时计算 rounds 次，得到内存带宽等共享资源竞争下的真实吞吐
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'DjangoProject.settings'),),
+            ) as executor:
+                list(executor.map(_time_hashes, [path] * workers, [1] * workers))
+                started = time.perf_counter()
+                list(executor.map(_time_hashes, [path] * workers, [rounds] * workers))
+                elapsed = time.perf_counter() - started
+            result['parallel_hashes_per_second'] = round(workers * rounds / elapsed, 2)
+
+        if options['target_ms']:
+            result['suggested'] = suggest_parameters(hasher, ms_per_hash, options['target_ms'])
+        return result
+
+    def print_report(self, report):
+        header = f"{'profile':<8} {'ms/hash':>9} {'hash/s/core':>12} {'parallel hash/s':>16}  parameters"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for profile, row in report['results'].items():
+            parallel = row.get('parallel_hashes_per_second', '-')
+            params = ' '.join(f'{key}={value}' for key, value in row['parameters'].items())
+            self.stdout.write(
+                f"{profile:<8} {row['ms_per_hash']:>9.2f} {row['hashes_per_second_per_core']:>12.2f} "
+                f"{parallel:>16}  {params}"
+            )
+            if 'suggested' in row:
+                suggested = ' '.join(f'{key}={value}' for key, value in row['suggested'].items())
+                self.stdout.write(f"{'':<8} 建议: {suggested}")
@@ -0,0 +1,119 @@
+"""
+会话存储基准测试命令
+
+在临时测试数据库中依次使用 db、cached_db、cache、signed_cookies 四种会话存储，
+先通过登录页面登录一次，再重复请求一个需要登录的接口，统计每个请求访问
+django_session 表的次数、总查询次数和延迟。
+
+用法:
+    python manage.py benchmark_sessions --requests 50 --output sessions.json
+"""
+
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from .benchmark import BENCH_PASSWORD, _percentile, seed_directory
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def _session_queries(captured):
+    return sum(1 for query in captured if 'django_session' in query['sql'])
+
+
+def measure_engine(engine, url, iterations):
+    """
+    使用指定会话存储登录并重复请求 url
+
+    返回:
+        dict: 登录请求和后续请求的会话查询次数、总查询次数及延迟（毫秒）
+    """
+    with override_settings(SESSION_ENGINE=engine, PASSWORD_HASHING_WORKERS=0):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        # 每种存储使用新的客户端，使 SessionMiddleware 按当前配置加载
+        client = Client()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(reverse('demo:login'), {'username': 'bench-member', 'password': BENCH_PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f'登录失败: HTTP {response.status_code}')
+        login = {'session_queries': _session_queries(ctx.captured_queries), 'queries': len(ctx.captured_queries)}
+
+        latencies = []
+        session_queries = []
+        queries = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - started) * 1000)
+            session_queries.append(_session_queries(ctx.captured_queries))
+            queries.append(len(ctx.captured_queries))
+
+    return {
+        'status': response.status_code,
+        'login_session_queries': login['session_queries'],
+        'login_queries': login['queries'],
+        'session_queries_per_request': round(sum(session_queries) / iterations, 2),
+        'queries_per_request': round(sum(queries) / iterations, 2),
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = '比较不同会话存储下登录及已登录请求访问会话表的次数和延迟'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='*', choices=sorted(SESSION_ENGINES), default=None,
+                            help='要测试的会话存储，默认全部')
+        parser.add_argument('--requests', type=int, default=50, help='登录后的请求次数')
+        parser.add_argument('--output', default=None, help='将结果以JSON写入该文件')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed = seed_directory(user_count=10, group_count=1)
+            url = reverse('demo:group_detail_api', args=[seed['roles']['普通用户'].id])
+            report = {'meta': {'requests': options['requests'], 'url': url}, 'results': {}}
+            for name in options['engines'] or SESSION_ENGINES:
+                report['results'][name] = measure_engine(SESSION_ENGINES[name], url, options['requests'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['output']}"))
+
+    def print_report(self, report):
+        header = (f"{'engine':<16} {'login sess q':>12} {'sess q/req':>11} {'queries/req':>12} "
+                  f"{'p50 ms':>9} {'p95 ms':>9}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in report['results'].items():
+            self.stdout.write(
+                f"{name:<16} {row['login_session_queries']:>12} {row['session_queries_per_request']:>11} "
+                f"{row['queries_per_request']:>12} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f}"
+            )
@@ -0,0 +1,165 @@
+"""
+数据库并发写入基准测试命令
+
+为每个数据库配置创建独立的连接别名并执行迁移，多个线程同时更新用户记录，
+统计写入吞吐、延迟分位数和因锁等待失败的次数，用于比较 SQLite 默认日志模式、
+SQLite WAL 模式以及 PostgreSQL（可经由 PgBouncer）的写并发能力。
+
+不指定 --database-url 时，在临时目录中比较两种 SQLite 配置。
+指定 PostgreSQL 连接串时请使用专门的测试库：命令会在其中执行迁移并写入测试数据，结束后删除测试数据。
+
+用法:
+    python manage.py benchmark_writes --threads 8 --writes 200
+    python manage.py benchmark_writes --database-url postgres://user:pw@localhost/bench --threads 16
+"""
+
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from DjangoProject.database import database_from_url
+
+USERNAME_PREFIX = 'bench-write-'
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def register_database(alias, config):
+    """在运行时添加一个数据库连接别名"""
+    connections.settings[alias] = connections.configure_settings({DEFAULT_DB_ALIAS: config})[DEFAULT_DB_ALIAS]
+
+
+def run_writers(alias, user_ids, threads, writes):
+    """
+    多线程并发更新用户记录
+
+    每次写入在独立事务中先读取再保存一条用户记录，与 user_update 的访问模式一致。
+
+    返回:
+        dict: 吞吐（次/秒）、延迟分位数（毫秒）和失败次数
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local_latencies = []
+        local_errors = 0
+        start_barrier.wait()
+        try:
+            for i in range(writes):
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias):
+                        user = User.objects.using(alias).get(pk=rng.choice(user_ids))
+                        user.first_name = f'w{seed}-{i}'
+                        user.save(using=alias, update_fields=['first_name'])
+                except OperationalError:
+                    local_errors += 1
+                    continue
+                local_latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            connections[alias].close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'writes_per_second': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(_percentile(latencies, 0.50), 3) if latencies else None,
+        'p95_ms': round(_percentile(latencies, 0.95), 3) if latencies else None,
+        'failed': sum(errors),
+        'succeeded': len(latencies),
+    }
+
+
+class Command(BaseCommand):
+    help = '比较不同数据库配置在多线程并发写入时的吞吐和锁等待失败次数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database-url', action='append', default=None,
+                            help='要测试的数据库连接串，可多次指定；默认比较SQLite默认模式与WAL模式')
+        parser.add_argument('--threads', type=int, default=8, help='并发写入线程数')
+        parser.add_argument('--writes', type=int, default=200, help='每个线程的写入次数')
+        parser.add_argument('--users', type=int, default=500, help='预先生成的用户数量')
+        parser.add_argument('--output', default=None, help='将结果以JSON写入该文件')
+
+    def handle(self, *args, **options):
+        tmpdir = tempfile.mkdtemp(prefix='bench-writes-')
+        try:
+            profiles = self.build_profiles(options['database_url'], tmpdir)
+            report = {
+                'meta': {'threads': options['threads'], 'writes': options['writes'], 'users': options['users']},
+                'results': {},
+            }
+            for index, (name, config) in enumerate(profiles):
+                alias = f'bench_writes_{index}'
+                register_database(alias, config)
+                try:
+                    report['results'][name] = self.measure(alias, options)
+                finally:
+                    connections[alias].close()
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['output']}"))
+
+    def build_profiles(self, urls, tmpdir):
+        """返回 [(名称, DATABASES配置), ...]"""
+        if urls:
+            return [(url.split('@')[-1], database_from_url(url, settings.BASE_DIR)) for url in urls]
+        return [
+            ('sqlite-default', database_from_url(f'sqlite:///{tmpdir}/default.sqlite3', tmpdir, sqlite_wal=False)),
+            ('sqlite-wal', database_from_url(f'sqlite:///{tmpdir}/wal.sqlite3', tmpdir)),
+        ]
+
+    def measure(self, alias, options):
+        call_command('migrate', database=alias, verbosity=0, interactive=False)
+        manager = User.objects.using(alias)
+        manager.filter(username__startswith=USERNAME_PREFIX).delete()
+        users = manager.bulk_create(
+            [User(username=f'{USERNAME_PREFIX}{i:06d}', password='!') for i in range(options['users'])]
+        )
+        user_ids = [user.pk for user in users] if users and users[0].pk else list(
+            manager.filter(username__startswith=USERNAME_PREFIX).values_list('pk', flat=True)
+        )
+        try:
+            return run_writers(alias, user_ids, options['threads'], options['writes'])
+        finally:
+            manager.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def print_report(self, report):
+        header = f"{'database':<28} {'writes/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'failed':>7}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in report['results'].items():
+            p50 = f"{row['p50_ms']:.2f}" if row['p50_ms'] is not None else '-'
+            p95 = f"{row['p95_ms']:.2f}" if row['p95_ms'] is not None else '-'
+            self.stdout.write(f"{name:<28} {row['writes_per_second']:>10} {p50:>9} {p95:>9} {row['failed']:>7}")
@@ -0,0 +1,49 @@
+"""
+批量导入用户命令
+
+用法:
+    python manage.py import_users users.jsonl
+    python manage.py import_users users.csv --report errors.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from demo.bulk_import import IMPORT_BATCH_SIZE, detect_format, import_users, parse_rows
+from demo.logger import log_audit
+
+
+class Command(BaseCommand):
+    help = '从 JSON Lines 或 CSV 文件批量导入用户，单行错误不会中断导入'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='导入文件路径（.jsonl/.json 或 .csv）')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help='文件格式，默认根据扩展名判断')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='每批写入的行数')
+        parser.add_argument('--report', default=None, help='将完整导入结果（含错误明细）以JSON写入该文件')
+
+    def handle(self, *args, **options):
+        fmt = detect_format(filename=options['path'], explicit=options['format'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as fh:
+                result = import_users(parse_rows(fh, fmt), batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(f'无法读取文件: {e}')
+
+        log_audit(
+            f"命令行批量导入用户: {options['path']} 共 {result.total} 行, 创建成功 {result.created}, 失败 {len(result.errors)}",
+            context="user_management"
+        )
+        for error in result.errors[:20]:
+            self.stderr.write(f"第 {error['line']} 行 {error['username'] or ''}: {error['error']}")
+        if len(result.errors) > 20:
+            self.stderr.write(f'... 其余 {len(result.errors) - 20} 条错误请查看 --report 输出')
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as fh:
+                json.dump(result.as_dict(), fh, ensure_ascii=False, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'导入完成: 共 {result.total} 行, 创建 {result.created}, 失败 {len(result.errors)}'
+        ))
@@ -0,0 +1,28 @@
+"""
+清理仪表盘变更记录命令
+
+变更记录只用于仪表盘增量刷新，过期记录可以定期删除；
+版本号早于剩余记录的仪表盘下次刷新时会整页重新加载。
+
+用法:
+    python manage.py prune_changes --days 7
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from demo.changefeed import prune_changes
+
+
+class Command(BaseCommand):
+    help = '删除早于保留期限的用户/用户组变更记录'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=getattr(settings, 'CHANGE_FEED_RETENTION_DAYS', 7),
+                            help='保留天数，默认 CHANGE_FEED_RETENTION_DAYS')
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'已删除 {deleted} 条变更记录'))
@@ -0,0 +1,166 @@
+"""
+请求指标模块
+
+按URL名称（如 demo:users_api）在进程内记录请求耗时、数据库查询次数和数据库耗时的直方图，
+并以Prometheus文本格式导出。每个Gunicorn worker各自统计。
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+
+# 直方图桶上限
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNRESOLVED_VIEW = 'unresolved'
+
+
+class Histogram:
+    """累积直方图（由 MetricsRegistry 加锁访问）"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[index] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def cumulative(self):
+        """返回 [(上限, 累积数量), ...]"""
+        running = 0
+        result = []
+        for upper, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((upper, running))
+        return result
+
+
+class MetricsRegistry:
+    """按视图名称保存各项直方图"""
+
+    METRICS = (
+        ('demo_request_duration_seconds', '请求处理耗时（秒）', DURATION_BUCKETS),
+        ('demo_request_db_queries', '每个请求的数据库查询次数', QUERY_COUNT_BUCKETS),
+        ('demo_request_db_duration_seconds', '每个请求的数据库耗时（秒）', DURATION_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name, duration, query_count, db_duration):
+        with self._lock:
+            histograms = self._views.get(view_name)
+            if histograms is None:
+                histograms = [Histogram(buckets) for _, _, buckets in self.METRICS]
+                self._views[view_name] = histograms
+            for histogram, value in zip(histograms, (duration, query_count, db_duration)):
+                histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self):
+        """
+        导出Prometheus文本格式
+
+        返回:
+            str: text/plain; version=0.0.4 格式的指标文本
+        """
+        lines = []
+        with self._lock:
+            views = sorted(self._views.items())
+            for index, (name, help_text, _) in enumerate(self.METRICS):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view_name, histograms in views:
+                    histogram = histograms[index]
+                    label = _escape_label(view_name)
+                    for upper, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{view="{label}",le="{_format_bound(upper)}"}} {count}')
+                    lines.append(f'{name}_bucket{{view="{label}",le="+Inf"}} {histogram.total}')
+                    lines.append(f'{name}_sum{{view="{label}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{view="{label}"}} {histogram.total}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(value):
+    return f'{value:g}'
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    """单个请求的数据库统计"""
+
+    __slots__ = ('query_count', 'db_duration')
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_duration = 0.0
+
+
+# 当前请求的统计对象，为 None 时不记录
+_current_stats = ContextVar('request_metrics', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    """数据库执行包装器，累计当前请求的查询次数和耗时"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_duration += time.perf_counter() - start
+        stats.query_count += 1
+
+
+def install_query_recorder():
+    """确保当前线程的所有数据库连接都挂上查询记录包装器"""
+    for connection in connections.all():
+        if _record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_record_query)
+
+
+def begin_request():
+    """
+    开始记录一个请求
+
+    返回:
+        tuple: (RequestStats, 上下文令牌, 开始时间)
+    """
+    install_query_recorder()
+    stats = RequestStats()
+    return stats, _current_stats.set(stats), time.perf_counter()
+
+
+def activate(stats):
+    """在流式响应迭代期间重新激活请求统计，返回上下文令牌"""
+    return _current_stats.set(stats)
+
+
+def deactivate(token):
+    _current_stats.reset(token)
+
+
+def finish_request(view_name, stats, started):
+    """记录一个已完成请求的指标"""
+    registry.observe(view_name, time.perf_counter() - started, stats.query_count, stats.db_duration)
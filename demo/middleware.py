@@ -0,0 +1,139 @@
+"""
+中间件模块
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+from .logger import (
+    CATEGORY_SECURITY,
+    flush_request_log_buffer,
+    start_request_log_buffer,
+)
+
+
+class RequestLogBufferMiddleware:
+    """
+    请求级日志缓冲中间件
+
+    在请求期间收集 log_operation/log_audit/log_security 的日志，
+    在返回响应时按类别合并写入。通过 LOG_REQUEST_BATCHING 启用；
+    LOG_SECURITY_UNBUFFERED 为 True 时安全日志仍立即写入。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'LOG_REQUEST_BATCHING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.immediate_categories = (
+            (CATEGORY_SECURITY,) if getattr(settings, 'LOG_SECURITY_UNBUFFERED', True) else ()
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = start_request_log_buffer(self.immediate_categories)
+        try:
+            return self.get_response(request)
+        finally:
+            flush_request_log_buffer(token, request)
+
+    async def __acall__(self, request):
+        token = start_request_log_buffer(self.immediate_categories)
+        try:
+            return await self.get_response(request)
+        finally:
+            flush_request_log_buffer(token, request)
+
+
+class RequestMetricsMiddleware:
+    """
+    请求指标中间件
+
+    按解析后的URL名称记录请求耗时、数据库查询次数和数据库耗时，
+    流式响应在内容输出完毕后才计入。通过 REQUEST_METRICS_ENABLED 关闭。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, started = metrics.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        # 异步视图的ORM调用在线程中执行，查询记录器要挂在那个线程的连接上
+        await sync_to_async(metrics.install_query_recorder)()
+        stats, token, started = metrics.begin_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self._finish(request, response, stats, started)
+
+    def _finish(self, request, response, stats, started):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else metrics.UNRESOLVED_VIEW
+        if not response.streaming:
+            metrics.finish_request(view_name, stats, started)
+        elif response.is_async:
+            response.streaming_content = self._aobserve_stream(
+                response.streaming_content, view_name, stats, started
+            )
+        else:
+            response.streaming_content = self._observe_stream(
+                response.streaming_content, view_name, stats, started
+            )
+        return response
+
+    @staticmethod
+    def _observe_stream(content, view_name, stats, started):
+        iterator = iter(content)
+        try:
+            while True:
+                token = metrics.activate(stats)
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    metrics.deactivate(token)
+                yield chunk
+        finally:
+            metrics.finish_request(view_name, stats, started)
+
+    @staticmethod
+    async def _aobserve_stream(content, view_name, stats, started):
+        iterator = content.__aiter__()
+        try:
+            while True:
+                token = metrics.activate(stats)
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    metrics.deactivate(token)
+                yield chunk
+        finally:
+            metrics.finish_request(view_name, stats, started)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('user', '用户'), ('group', '用户组')], max_length=8)),
+                ('object_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('created', '创建'), ('updated', '更新'), ('deleted', '删除')], default='updated', max_length=8)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""
+用户目录查询使用的 auth_user 索引
+
+auth_user 属于 django.contrib.auth，不能在模型上声明索引，这里用 SQL 创建（SQLite 与 PostgreSQL 通用）：
+    - LOWER(username) / LOWER(email): 不区分大小写的前缀搜索（demo.api.filters）
+    - (is_active, username): 按状态筛选并按用户名分页
+    - (date_joined, id): 按注册时间排序分页
+"""
+
+from django.db import migrations
+
+INDEXES = [
+    ('demo_user_username_lower', 'LOWER(username)'),
+    ('demo_user_email_lower', 'LOWER(email)'),
+    ('demo_user_active_username', 'is_active, username'),
+    ('demo_user_date_joined_id', 'date_joined, id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('demo', '0003_changelogentry_kind_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX {name} ON auth_user ({columns})',
+            reverse_sql=f'DROP INDEX {name}',
+        )
+        for name, columns in INDEXES
+    ]
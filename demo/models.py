@@ -1,3 +1,42 @@
 from django.db import models
 
-# Create your models here.
+
+class ChangeLogEntry(models.Model):
+    """
+    用户/用户组变更记录
+
+    自增主键即变更版本号，单调递增；action 为 deleted 的记录是删除的墓碑。
+    由 demo.changefeed.record_changes 写入，供仪表盘增量刷新和实时事件推送读取。
+    """
+
+    KIND_USER = 'user'
+    KIND_GROUP = 'group'
+    KIND_CHOICES = [
+        (KIND_USER, '用户'),
+        (KIND_GROUP, '用户组'),
+    ]
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [
+        (CREATED, '创建'),
+        (UPDATED, '更新'),
+        (DELETED, '删除'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    object_id = models.IntegerField()
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES, default=UPDATED)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # 按类型取最新版本号（条件请求的 ETag）
+            models.Index(fields=['kind', '-id'], name='demo_change_kind_id'),
+        ]
+
+    def __str__(self):
+        return f'#{self.id} {self.kind}.{self.action}:{self.object_id}'
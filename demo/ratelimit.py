@@ -0,0 +1,72 @@
+"""
+限流模块
+
+基于缓存的固定窗口计数器：同一作用域和标识在每个窗口内最多允许 limit 次请求。
+多进程部署时需要共享缓存（如Redis或文件缓存），本地内存缓存只在单进程内生效。
+
+按IP限流时用 client_ip 取得调用方地址：X-Forwarded-For 可以由客户端任意填写，
+只有 TRUSTED_PROXY_COUNT 个受信任反向代理追加的条目才可信。
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def client_ip(request):
+    """
+    获取用于限流的客户端IP
+
+    TRUSTED_PROXY_COUNT 为0（默认）时直接使用 REMOTE_ADDR；部署在 N 层反向代理之后时
+    设置为 N，取 X-Forwarded-For 中倒数第 N 个条目（由最外层受信任代理写入）。
+
+    参数:
+        request (HttpRequest): 请求对象
+
+    返回:
+        str: 客户端IP
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', 'unknown')
+    hops = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    if hops <= 0:
+        return remote_addr
+    forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+    # 条目少于代理层数说明请求没有经过全部代理，头部不可信
+    if len(forwarded) < hops:
+        return remote_addr
+    return forwarded[-hops]
+
+
+def _window_key(scope, ident, window):
+    return f'demo:ratelimit:{scope}:{ident}:{int(time.time() // window)}'
+
+
+async def acheck_rate_limit(scope, ident, limit, window, cache_alias='default'):
+    """
+    记录一次请求并检查是否超出限制
+
+    参数:
+        scope (str): 限流作用域，如接口名称
+        ident (str): 调用方标识，如客户端IP
+        limit (int): 每个窗口允许的请求数，小于等于0表示不限流
+        window (int): 窗口长度（秒）
+        cache_alias (str): 使用的缓存别名
+
+    返回:
+        int: 需要等待的秒数，0 表示允许本次请求
+    """
+    if limit <= 0:
+        return 0
+    cache = caches[cache_alias]
+    key = _window_key(scope, ident, window)
+    await cache.aadd(key, 0, timeout=window)
+    try:
+        count = await cache.aincr(key)
+    except ValueError:
+        # 计数键恰好在 add 与 incr 之间过期
+        await cache.aset(key, 1, timeout=window)
+        count = 1
+    if count <= limit:
+        return 0
+    return max(1, int(window - time.time() % window))
@@ -0,0 +1,122 @@
+"""
+数据库路由模块
+
+读多写少的视图用 use_read_replica 装饰后，视图内对 auth/contenttypes 模型的读查询
+会发送到 DATABASE_REPLICAS 中随机选择的一个只读副本；写入及其他视图始终使用主库。
+
+用 pin_primary 装饰的写视图成功后会设置一个短期Cookie，在 REPLICA_STICKY_SECONDS 秒内
+该客户端的读请求仍然发往主库，保证刚写入的数据立即可见（读己之写）。
+"""
+
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'demo_pin_primary'
+DEFAULT_ROUTED_APPS = ('auth', 'contenttypes')
+
+# 当前请求的读副本别名，为 None 时使用主库
+_read_alias = ContextVar('replica_read_alias', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def is_pinned(request):
+    """客户端最近写入过，读请求需要留在主库"""
+    return PIN_COOKIE in request.COOKIES
+
+
+def _activate(request):
+    aliases = replica_aliases()
+    if not aliases or is_pinned(request):
+        return None
+    return _read_alias.set(random.choice(aliases))
+
+
+def _deactivate(token):
+    if token is not None:
+        _read_alias.reset(token)
+
+
+def use_read_replica(view_func):
+    """
+    视图内的读查询发往只读副本（没有配置副本或客户端已固定到主库时不生效）
+
+    应放在登录与权限装饰器之后（即紧贴视图函数），使会话与权限检查仍读取主库。
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            token = _activate(request)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _deactivate(token)
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        token = _activate(request)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _deactivate(token)
+    return _wrapped_view
+
+
+def _pin(request, response):
+    if replica_aliases() and response.status_code < 400:
+        response.set_cookie(
+            PIN_COOKIE, '1',
+            max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+def pin_primary(view_func):
+    """写视图成功后，在 REPLICA_STICKY_SECONDS 秒内把该客户端的读请求固定到主库"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            return _pin(request, await view_func(request, *args, **kwargs))
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        return _pin(request, view_func(request, *args, **kwargs))
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    """按 use_read_replica 激活的副本别名路由读查询"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None:
+            return None
+        if model._meta.app_label not in getattr(settings, 'REPLICA_ROUTED_APPS', DEFAULT_ROUTED_APPS):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本的结构和数据由主库复制而来
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,137 @@
+"""
+信号处理模块
+
+监听用户和用户组的变更，使依赖这些数据的缓存（统计、用户名占用、授权信息）失效，
+并写入仪表盘增量刷新使用的变更记录。
+用户改名时旧用户名的缓存由 user_update 视图清除（post_save 拿不到旧值）。
+"""
+
+from django.contrib.auth.models import User, Group
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .authz import invalidate_authorization
+from .changefeed import CREATED, DELETED, GROUP, UPDATED, USER, record_changes
+from .stats import invalidate_dashboard_stats
+from .usernames import invalidate_usernames
+
+
+@receiver(post_save, sender=User, dispatch_uid='demo_stats_user_saved')
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # 登录时只更新 last_login，不影响统计数据
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_dashboard_stats()
+
+
+@receiver(post_delete, sender=User, dispatch_uid='demo_stats_user_deleted')
+@receiver(post_save, sender=Group, dispatch_uid='demo_stats_group_saved')
+@receiver(post_delete, sender=Group, dispatch_uid='demo_stats_group_deleted')
+def directory_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid='demo_stats_membership_changed')
+def membership_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=User, dispatch_uid='demo_username_saved')
+@receiver(post_delete, sender=User, dispatch_uid='demo_username_deleted')
+def username_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    invalidate_usernames([instance.username])
+
+
+@receiver(post_save, sender=User, dispatch_uid='demo_authz_user_saved')
+@receiver(post_delete, sender=User, dispatch_uid='demo_authz_user_deleted')
+def user_authorization_changed(sender, instance, update_fields=None, **kwargs):
+    # 只更新 last_login/password 时角色和权限不变
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    invalidate_authorization([instance.pk])
+
+
+@receiver(post_save, sender=Group, dispatch_uid='demo_authz_group_saved')
+@receiver(post_delete, sender=Group, dispatch_uid='demo_authz_group_deleted')
+def group_authorization_changed(sender, **kwargs):
+    # 用户组改名或删除会改变默认角色组ID及其成员的权限
+    invalidate_authorization()
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid='demo_authz_membership_changed')
+@receiver(m2m_changed, sender=User.user_permissions.through, dispatch_uid='demo_authz_user_perms_changed')
+def user_relation_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # user.groups.add(...) / user.user_permissions.add(...)
+        invalidate_authorization([instance.pk])
+    elif action == 'post_clear':
+        # group.user_set.clear() 等，无法得知受影响的用户
+        invalidate_authorization()
+    else:
+        # group.user_set.add(...)，pk_set 为用户ID
+        invalidate_authorization(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid='demo_authz_group_perms_changed')
+def group_permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_authorization()
+
+
+def _member_ids(group, using):
+    # 从用户组所在的库读取成员，而不是由路由决定
+    return list(User.groups.through.objects.using(using).filter(group_id=group.pk).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=User, dispatch_uid='demo_changes_user_saved')
+def record_user_saved(sender, instance, created, update_fields=None, using=None, **kwargs):
+    # last_login/password 不在仪表盘中显示
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    record_changes(USER, [instance.pk], CREATED if created else UPDATED, using=using)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='demo_changes_user_deleted')
+def record_user_deleted(sender, instance, using=None, **kwargs):
+    # 用户组成员数随统计数据一起下发，这里只记录用户本身
+    record_changes(USER, [instance.pk], DELETED, using=using)
+
+
+@receiver(post_save, sender=Group, dispatch_uid='demo_changes_group_saved')
+def record_group_saved(sender, instance, created, using=None, **kwargs):
+    record_changes(GROUP, [instance.pk], CREATED if created else UPDATED, using=using)
+    if not created:
+        # 用户组改名会改变成员行中显示的用户组名称
+        record_changes(USER, _member_ids(instance, using), using=using)
+
+
+@receiver(pre_delete, sender=Group, dispatch_uid='demo_changes_group_deleting')
+def remember_group_members(sender, instance, using=None, **kwargs):
+    # 用户组关系随用户组级联删除且不发送 m2m_changed，先记下成员
+    instance._changefeed_members = _member_ids(instance, using)
+
+
+@receiver(post_delete, sender=Group, dispatch_uid='demo_changes_group_deleted')
+def record_group_deleted(sender, instance, using=None, **kwargs):
+    record_changes(GROUP, [instance.pk], DELETED, using=using)
+    record_changes(USER, getattr(instance, '_changefeed_members', []), using=using)
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid='demo_changes_membership_changed')
+def record_membership_changed(sender, instance, action, reverse, pk_set=None, using=None, **kwargs):
+    if not reverse:
+        # user.groups.add(...) 等
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            record_changes(USER, [instance.pk], using=using)
+    elif action == 'pre_clear':
+        # group.user_set.clear() 的 post_clear 不带 pk_set，先记下成员
+        instance._changefeed_members = _member_ids(instance, using)
+    elif action == 'post_clear':
+        record_changes(USER, getattr(instance, '_changefeed_members', []), using=using)
+    elif action in ('post_add', 'post_remove'):
+        record_changes(USER, pk_set or [], using=using)
@@ -1,5 +1,7 @@
 // Behaviour for the user management dashboard
 (function () {
+    const USER_PAGE_SIZE = 50;
+    const LIVE_EVENT_TYPES = ['user.created', 'user.updated', 'user.deleted', 'group.created', 'group.updated', 'group.deleted'];
     const dashboardState = window.dashboardState || {};
     const state = {
         currentUserId: Number(dashboardState.currentUserId) || null,
@@ -10,7 +12,13 @@
         canChangeGroup: !!dashboardState.canChangeGroup,
         activeView: 'userListView',
         activeGroupId: null,
-        lastModalId: null
+        lastModalId: null,
+        nextCursor: dashboardState.nextCursor || null,
+        loadingPage: false,
+        changeVersion: Number(dashboardState.changeVersion) || 0,
+        syncing: null,
+        query: '',
+        searchRequest: 0
     };
 
     document.addEventListener('DOMContentLoaded', () => {
@@ -23,24 +31,33 @@
         bindPasswordStrengthMeter();
         initViewSwitching();
         setupSearch();
+        setupInfiniteScroll();
         bindGlobalActions();
         showDefaultHint();
         switchView(state.activeView);
+        connectLiveUpdates();
     });
 
     function bindTableRowEffects() {
         document.querySelectorAll('table.highlight tbody tr').forEach(row => {
+            if (row.dataset.effectsBound) {
+                return;
+            }
+            row.dataset.effectsBound = 'true';
             row.addEventListener('mouseenter', () => row.classList.add('hovered'));
             row.addEventListener('mouseleave', () => row.classList.remove('hovered'));
             row.addEventListener('click', event => {
                 if (event.target.closest('a, button, .btn, .btn-small')) {
                     return;
                 }
-                document.querySelectorAll('table.highlight tbody tr.selected').forEach(activeRow => {
-                    if (activeRow !== row) {
-                        activeRow.classList.remove('selected');
-                    }
-                });
+                // Ctrl/Cmd + click keeps the current selection for bulk actions
+                if (!event.ctrlKey && !event.metaKey) {
+                    document.querySelectorAll('table.highlight tbody tr.selected').forEach(activeRow => {
+                        if (activeRow !== row) {
+                            activeRow.classList.remove('selected');
+                        }
+                    });
+                }
                 row.classList.toggle('selected');
             });
         });
@@ -99,8 +116,8 @@
             return;
         }
         input.addEventListener('input', debounce(() => {
-            filterUserTable(input.value);
-        }, 200));
+            searchUsers(input.value);
+        }, 250));
     }
 
     function bindGlobalActions() {
@@ -172,6 +189,10 @@
                 event.preventDefault();
                 removeUserFromGroup(trigger, trigger.getAttribute('data-user-id'));
                 break;
+            case 'bulk-user-action':
+                event.preventDefault();
+                runBulkUserAction(trigger, trigger.getAttribute('data-bulk-action'));
+                break;
             default:
                 break;
         }
@@ -231,16 +252,32 @@
         });
     }
 
-    function filterUserTable(keyword) {
-        const rows = document.querySelectorAll('#userTableBody tr');
-        if (!rows.length) {
-            return;
-        }
-        const normalized = (keyword || '').trim().toLowerCase();
-        rows.forEach(row => {
-            const text = row.innerText.toLowerCase();
-            const visible = !normalized || text.includes(normalized);
-            row.style.display = visible ? '' : 'none';
+    // Prefix search on username/email runs server-side (indexed); the table shows the first page of matches
+    function searchUsers(keyword) {
+        state.query = (keyword || '').trim();
+        const requestId = ++state.searchRequest;
+        state.loadingPage = true;
+        fetchUserPage(null).then(data => {
+            if (requestId !== state.searchRequest || !data || !data.users) {
+                return;
+            }
+            const body = document.getElementById('userTableBody');
+            if (!body) {
+                return;
+            }
+            body.innerHTML = '';
+            state.nextCursor = data.next_cursor || null;
+            if (data.users.length) {
+                appendUserRows(data.users);
+            } else {
+                body.innerHTML = `<tr class="empty-row"><td colspan="5">${state.query ? 'No matching users' : 'No user accounts found'}</td></tr>`;
+            }
+        }).catch(() => {
+            showToast('Search failed. Please retry.', 'error');
+        }).finally(() => {
+            if (requestId === state.searchRequest) {
+                state.loadingPage = false;
+            }
         });
     }
 
@@ -366,7 +403,7 @@
                 closeActiveModal();
                 showToast('User saved.', 'success');
                 showHint(userId ? 'The account was updated.' : 'New account created.');
-                setTimeout(() => window.location.reload(), 900);
+                syncChanges();
             } else {
                 showToast(data && data.message ? data.message : 'Save failed.', 'error');
             }
@@ -399,6 +436,7 @@
                         row.classList.add('fade-out');
                         setTimeout(() => row.remove(), 260);
                     }
+                    syncChanges();
                 } else {
                     showToast(data && data.message ? data.message : 'Delete failed.', 'error');
                 }
@@ -412,6 +450,68 @@
         });
     }
 
+    function selectedUserIds() {
+        return Array.from(document.querySelectorAll('#userTableBody tr.selected[data-user-id]'))
+            .map(row => Number(row.getAttribute('data-user-id')))
+            .filter(id => id && id !== state.currentUserId);
+    }
+
+    function runBulkUserAction(trigger, action) {
+        const userIds = selectedUserIds();
+        if (!userIds.length) {
+            showToast('Select one or more users first (Ctrl/Cmd + click).', 'error');
+            return;
+        }
+        const labels = { activate: 'Activate', deactivate: 'Suspend', delete: 'Delete' };
+        confirmAction(`${labels[action] || action} ${userIds.length} selected account(s)?`, () => {
+            const button = trigger || null;
+            const originalLabel = button ? button.innerHTML : '';
+            if (button) {
+                showLoading(button, 'Working...');
+            }
+            sendRequest('/users/bulk/', {
+                method: 'POST',
+                body: JSON.stringify({ action: action, user_ids: userIds })
+            }).then(data => {
+                if (data && data.status === 'success') {
+                    applyBulkResult(action, userIds);
+                    syncChanges();
+                    showToast(`${data.affected} account(s) updated.`, 'success');
+                } else {
+                    showToast(data && data.message ? data.message : 'Bulk action failed.', 'error');
+                }
+            }).catch(() => {
+                showToast('Bulk action failed. Please retry.', 'error');
+            }).finally(() => {
+                if (button) {
+                    hideLoading(button, originalLabel);
+                }
+            });
+        });
+    }
+
+    function applyBulkResult(action, userIds) {
+        userIds.forEach(userId => {
+            const row = document.querySelector(`#userTableBody tr[data-user-id="${userId}"]`);
+            if (!row) {
+                return;
+            }
+            row.classList.remove('selected');
+            if (action === 'delete') {
+                row.classList.add('fade-out');
+                setTimeout(() => row.remove(), 260);
+                return;
+            }
+            const badge = row.querySelector('.badge');
+            if (badge) {
+                const isActive = action === 'activate';
+                badge.classList.toggle('active', isActive);
+                badge.classList.toggle('inactive', !isActive);
+                badge.textContent = isActive ? 'Active' : 'Suspended';
+            }
+        });
+    }
+
     function showChangePasswordModal(userId) {
         const form = document.getElementById('passwordForm');
         if (!form) {
@@ -554,6 +654,7 @@
                 showToast('Member added.', 'success');
                 showHint('The user has been added to the group.');
                 showGroupMembers(state.activeGroupId);
+                syncChanges();
             } else {
                 showToast(data && data.message ? data.message : 'Operation failed.', 'error');
             }
@@ -583,6 +684,7 @@
                 if (data && data.status === 'success') {
                     showToast('Member removed.', 'success');
                     showGroupMembers(state.activeGroupId);
+                    syncChanges();
                 } else {
                     showToast(data && data.message ? data.message : 'Operation failed.', 'error');
                 }
@@ -596,26 +698,73 @@
         });
     }
 
+    function setupInfiniteScroll() {
+        const table = document.getElementById('userTable');
+        if (!table || !('IntersectionObserver' in window)) {
+            return;
+        }
+        const sentinel = document.createElement('div');
+        sentinel.id = 'userTableSentinel';
+        sentinel.setAttribute('aria-hidden', 'true');
+        table.insertAdjacentElement('afterend', sentinel);
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextUserPage();
+            }
+        }, { rootMargin: '200px' });
+        observer.observe(sentinel);
+    }
+
+    function fetchUserPage(cursor) {
+        const params = new URLSearchParams({ limit: USER_PAGE_SIZE });
+        if (state.query) {
+            params.set('q', state.query);
+        }
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return sendRequest(`/users/api/?${params.toString()}`);
+    }
+
+    function appendUserRows(users) {
+        const body = document.getElementById('userTableBody');
+        if (!body) {
+            return;
+        }
+        const fragment = document.createDocumentFragment();
+        users.forEach(user => fragment.appendChild(renderUserRow(user)));
+        body.appendChild(fragment);
+        bindTableRowEffects();
+    }
+
+    function loadNextUserPage() {
+        if (!state.nextCursor || state.loadingPage) {
+            return;
+        }
+        state.loadingPage = true;
+        const requestId = state.searchRequest;
+        fetchUserPage(state.nextCursor).then(data => {
+            // A new search replaced the table while this page was loading
+            if (requestId !== state.searchRequest || !data || !data.users) {
+                return;
+            }
+            state.nextCursor = data.next_cursor || null;
+            appendUserRows(data.users);
+        }).catch(() => {
+            showToast('Unable to load more users.', 'error');
+        }).finally(() => {
+            state.loadingPage = false;
+        });
+    }
+
     function refreshUserList(trigger) {
         const button = trigger || null;
         const originalLabel = button ? button.innerHTML : '';
         if (button) {
             showLoading(button, 'Refreshing...');
         }
-        sendRequest('/users/api/').then(data => {
-            const body = document.getElementById('userTableBody');
-            if (!body || !data || !data.users) {
-                return;
-            }
-            body.innerHTML = '';
-            data.users.forEach(user => body.appendChild(renderUserRow(user)));
-            bindTableRowEffects();
-            const searchInput = document.getElementById('userSearchInput');
-            if (searchInput && searchInput.value.trim()) {
-                filterUserTable(searchInput.value);
-            }
-            showToast('Directory updated.', 'success');
-            showHint('The latest account list is now visible.');
+        syncChanges().then(changed => {
+            showToast(changed ? 'Directory updated.' : 'Directory is up to date.', 'success');
         }).catch(() => {
             showToast('Refresh failed. Please retry.', 'error');
         }).finally(() => {
@@ -625,6 +774,183 @@
         });
     }
 
+    // Server-sent events from /events/ (ASGI only) announce edits made elsewhere; each burst triggers one delta sync.
+    // Under WSGI the endpoint answers 204 and EventSource gives up, leaving the manual refresh button.
+    function connectLiveUpdates() {
+        if (!('EventSource' in window)) {
+            return;
+        }
+        const source = new EventSource('/events/');
+        const scheduleSync = debounce(() => {
+            syncChanges().catch(() => {});
+        }, 250);
+        // Catch up on anything missed while the stream was (re)connecting
+        source.addEventListener('open', scheduleSync);
+        LIVE_EVENT_TYPES.forEach(type => {
+            source.addEventListener(type, event => {
+                let payload = {};
+                try {
+                    payload = JSON.parse(event.data);
+                } catch (error) {
+                    payload = {};
+                }
+                if (!payload.version || payload.version > state.changeVersion) {
+                    scheduleSync();
+                }
+            });
+        });
+    }
+
+    // Pull only the users and groups changed since state.changeVersion and patch the page in place
+    function syncChanges() {
+        if (state.syncing) {
+            // Chain behind the running sync so edits made meanwhile are not missed
+            state.syncing = state.syncing.catch(() => false).then(() => fetchChanges());
+        } else {
+            state.syncing = fetchChanges();
+        }
+        const current = state.syncing;
+        return current.finally(() => {
+            if (state.syncing === current) {
+                state.syncing = null;
+            }
+        });
+    }
+
+    function fetchChanges() {
+        return sendRequest(`/changes/?since=${state.changeVersion}`).then(data => {
+            if (!data) {
+                return false;
+            }
+            if (data.reset) {
+                window.location.reload();
+                return true;
+            }
+            applyUserChanges(data.users || [], data.deleted ? data.deleted.users : []);
+            applyGroupChanges(data.groups || [], data.deleted ? data.deleted.groups : []);
+            if (data.stats) {
+                applyStats(data.stats);
+            }
+            const changed = data.version !== state.changeVersion;
+            state.changeVersion = data.version;
+            return changed;
+        });
+    }
+
+    function applyUserChanges(users, deletedIds) {
+        const body = document.getElementById('userTableBody');
+        if (!body) {
+            return;
+        }
+        deletedIds.forEach(userId => {
+            const row = body.querySelector(`tr[data-user-id="${userId}"]`);
+            if (row) {
+                row.remove();
+            }
+        });
+        users.forEach(user => {
+            const existing = body.querySelector(`tr[data-user-id="${user.id}"]`);
+            // While searching, only rows already in the result set are refreshed
+            if (!existing && state.query) {
+                return;
+            }
+            const row = renderUserRow(user);
+            if (existing) {
+                if (existing.classList.contains('selected')) {
+                    row.classList.add('selected');
+                }
+                existing.remove();
+            }
+            insertUserRow(body, row, user.username, !!existing);
+        });
+        const placeholder = body.querySelector('tr.empty-row');
+        if (placeholder && body.querySelector('tr[data-user-id]')) {
+            placeholder.remove();
+        }
+        bindTableRowEffects();
+    }
+
+    // Keep the username order used by the server; rows past the loaded page arrive with the next page
+    function insertUserRow(body, row, username, wasLoaded) {
+        const rows = Array.from(body.querySelectorAll('tr[data-user-id]'));
+        const next = rows.find(candidate => {
+            const title = candidate.querySelector('.cell-title');
+            return title && title.textContent > username;
+        });
+        if (next) {
+            body.insertBefore(row, next);
+        } else if (wasLoaded || !state.nextCursor) {
+            body.appendChild(row);
+        }
+    }
+
+    function applyGroupChanges(groups, deletedIds) {
+        const body = document.getElementById('groupTableBody');
+        const select = document.getElementById('userGroup');
+        deletedIds.forEach(groupId => {
+            const row = body ? body.querySelector(`tr[data-group-id="${groupId}"]`) : null;
+            if (row) {
+                row.remove();
+            }
+            const option = select ? select.querySelector(`option[value="${groupId}"]`) : null;
+            if (option) {
+                option.remove();
+            }
+        });
+        groups.forEach(group => {
+            if (body) {
+                const row = renderGroupRow(group);
+                const existing = body.querySelector(`tr[data-group-id="${group.id}"]`);
+                if (existing) {
+                    existing.replaceWith(row);
+                } else {
+                    const placeholder = body.querySelector('tr.empty-row');
+                    if (placeholder) {
+                        placeholder.remove();
+                    }
+                    body.appendChild(row);
+                }
+            }
+            if (select) {
+                let option = select.querySelector(`option[value="${group.id}"]`);
+                if (!option) {
+                    option = document.createElement('option');
+                    option.value = group.id;
+                    select.appendChild(option);
+                }
+                option.textContent = group.name;
+            }
+        });
+        bindTableRowEffects();
+    }
+
+    function applyStats(stats) {
+        ['user_count', 'active_user_count', 'group_count'].forEach(key => {
+            document.querySelectorAll(`[data-stat="${key}"]`).forEach(el => {
+                el.textContent = stats[key];
+            });
+        });
+        // Member counts are not part of the change log; they ride along with the cached stats
+        (stats.groups || []).forEach(group => {
+            const cell = document.querySelector(`#groupTableBody tr[data-group-id="${group.id}"] .member-count`);
+            if (cell) {
+                cell.textContent = group.member_count;
+            }
+        });
+    }
+
+    function renderGroupRow(group) {
+        const row = document.createElement('tr');
+        row.setAttribute('data-group-id', group.id);
+        row.innerHTML = '' +
+            `<td><div class="table-cell-primary"><span class="cell-title">${escapeHtml(group.name)}</span>` +
+            `<span class="cell-subtitle">ID: ${group.id}</span></div></td>` +
+            `<td class="member-count">${group.user_count}</td>` +
+            `<td class="align-right"><button type="button" class="btn ghost-btn" data-action="show-group-members" data-group-id="${group.id}">` +
+            '<i class="material-icons left">group</i>View members</button></td>';
+        return row;
+    }
+
     function renderUserRow(user) {
         const row = document.createElement('tr');
         row.setAttribute('data-user-id', user.id);
@@ -0,0 +1,70 @@
+"""
+仪表盘统计缓存模块
+
+将用户总数、激活用户数、用户组数及各用户组成员数缓存到Django缓存框架中，
+由 demo.signals 在用户或用户组发生变化时失效。
+
+统计数据总是在主库上计算：失效后若在 use_read_replica 视图内从有延迟的副本重新计算，
+旧数据会被重新写回缓存并保留到过期。
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User, Group
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+
+STATS_CACHE_KEY = 'demo:dashboard_stats'
+
+
+def _stats_cache():
+    """获取统计数据使用的缓存（DASHBOARD_STATS_CACHE 指定缓存别名）"""
+    return caches[getattr(settings, 'DASHBOARD_STATS_CACHE', 'default')]
+
+
+def compute_dashboard_stats():
+    """
+    从数据库计算仪表盘统计数据
+
+    返回:
+        dict: 统计数据
+            - user_count (int): 用户总数
+            - active_user_count (int): 激活用户数
+            - group_count (int): 用户组数
+            - groups (list): 各用户组 {'id', 'name', 'member_count'}，按名称排序
+    """
+    groups = list(
+        Group.objects.using(DEFAULT_DB_ALIAS).annotate(member_count=Count('user', distinct=True))
+        .order_by('name')
+        .values('id', 'name', 'member_count')
+    )
+    user_counts = User.objects.using(DEFAULT_DB_ALIAS).aggregate(
+        user_count=Count('id'),
+        active_user_count=Count('id', filter=Q(is_active=True)),
+    )
+    return {
+        'user_count': user_counts['user_count'],
+        'active_user_count': user_counts['active_user_count'],
+        'group_count': len(groups),
+        'groups': groups,
+    }
+
+
+def get_dashboard_stats():
+    """
+    获取仪表盘统计数据，优先读取缓存
+
+    返回:
+        dict: 与 compute_dashboard_stats 相同的结构
+    """
+    cache = _stats_cache()
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 300))
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """使缓存的统计数据失效"""
+    _stats_cache().delete(STATS_CACHE_KEY)
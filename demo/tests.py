@@ -1,3 +1,1032 @@
-from django.test import TestCase
+import asyncio
+import json
+from concurrent.futures import Future
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User, Group, Permission
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from DjangoProject.database import database_from_url
+
+from . import hashing
+from .hashing import HashingBusy
+from .authz import get_authorization, is_superadmin
+from . import changefeed
+from .changefeed import latest_version
+from .events import event_stream, get_broadcaster, reset_broadcaster
+from .models import ChangeLogEntry
+from .api.serializers import serialize_group_list, serialize_user_list
+from .logger import classify_user_agent, get_client_descriptor, logger
+from .metrics import registry
+from .routers import PIN_COOKIE, ReplicaRouter, use_read_replica
+from .stats import get_dashboard_stats
+from .usernames import invalidate_usernames
+
+
+def read_streaming_json(response):
+    return json.loads(b''.join(response.streaming_content))
+
+
+async def aread_streaming_json(response):
+    return json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+
+
+class UsersApiPaginationTests(TestCase):
+    """users_api 键集分页"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f'user{i:03d}') for i in range(25)])
+        cls.admin = User.objects.create_superuser(username='admin', password='admin')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_pages_cover_all_users_once(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 10}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('demo:users_api'), params).json()
+            seen.extend(user['username'] for user in data['users'])
+            cursor = data['next_cursor']
+            self.assertEqual(data['has_more'], cursor is not None)
+            if not cursor:
+                break
+        self.assertEqual(seen, sorted(User.objects.values_list('username', flat=True)))
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(reverse('demo:users_api'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unpaginated_mode_unchanged(self):
+        data = read_streaming_json(self.client.get(reverse('demo:users_api')))
+        self.assertEqual(len(data['users']), 26)
+        self.assertNotIn('next_cursor', data)
+
+    def test_requires_view_user_permission(self):
+        self.client.logout()
+        response = self.client.get(reverse('demo:users_api'), {'q': 'user0'})
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(User.objects.create_user(username='plain'))
+        self.assertEqual(self.client.get(reverse('demo:users_api'), {'q': 'user0'}).status_code, 302)
+
+
+class BatchSerializerQueryCountTests(TestCase):
+    """列表序列化的查询次数不随数据量增长"""
+
+    @staticmethod
+    def seed(count):
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        groups = Group.objects.bulk_create([Group(name=f'group{i}') for i in range(3)])
+        users = User.objects.bulk_create([User(username=f'user{i:05d}') for i in range(count)])
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=user.id, group_id=groups[i % len(groups)].id)
+            for i, user in enumerate(users)
+        ])
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return len(ctx.captured_queries)
+
+    def test_user_list_query_count_is_constant(self):
+        self.seed(10)
+        small = self.count_queries(lambda: serialize_user_list(User.objects.all()))
+        self.seed(10000)
+        large = self.count_queries(lambda: serialize_user_list(User.objects.all()))
+        self.assertEqual(small, large)
+        self.assertEqual(large, 2)
+
+    def test_group_list_query_count_is_constant(self):
+        self.seed(10)
+        small = self.count_queries(lambda: serialize_group_list(Group.objects.all()))
+        self.seed(10000)
+        large = self.count_queries(lambda: serialize_group_list(Group.objects.all()))
+        self.assertEqual(small, large)
+
+    def test_serialized_values_match_single_serializers(self):
+        self.seed(6)
+        data = serialize_user_list(User.objects.order_by('username'))
+        self.assertEqual(data[0]['group_name'], 'group0')
+        self.assertEqual(data[1]['group_name'], 'group1')
+        counts = {group['name']: group['user_count'] for group in serialize_group_list(list(Group.objects.all()))}
+        self.assertEqual(counts, {'group0': 2, 'group1': 2, 'group2': 2})
+
+
+class StreamingListEndpointTests(TestCase):
+    """大列表接口的流式输出"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='admin')
+        cls.group = Group.objects.create(name='普通用户')
+        for i in range(5):
+            user = User.objects.create_user(username=f'member{i}', email=f'm{i}@example.com')
+            user.groups.add(cls.group)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_users_api_stream_matches_batch_serializer(self):
+        response = self.client.get(reverse('demo:users_api'))
+        self.assertTrue(response.streaming)
+        streamed = sorted(read_streaming_json(response)['users'], key=lambda user: user['id'])
+        expected = serialize_user_list(User.objects.order_by('id'))
+        self.assertEqual(streamed, expected)
+
+    def test_group_members_stream(self):
+        response = self.client.get(reverse('demo:group_members', args=[self.group.id]))
+        data = read_streaming_json(response)
+        self.assertEqual(data['group_name'], '普通用户')
+        self.assertEqual(len(data['members']), 5)
+        self.assertEqual(set(data['members'][0]), {'id', 'username', 'email', 'is_active'})
+
+
+class DashboardStatsCacheTests(TestCase):
+    """仪表盘统计缓存及信号失效"""
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='普通用户')
+        self.user = User.objects.create_user(username='alice')
+
+    def test_cached_stats_need_no_queries(self):
+        get_dashboard_stats()
+        with self.assertNumQueries(0):
+            stats = get_dashboard_stats()
+        self.assertEqual(stats['user_count'], 1)
+
+    def test_user_and_membership_changes_invalidate(self):
+        self.assertEqual(get_dashboard_stats()['user_count'], 1)
+        User.objects.create_user(username='bob', is_active=False)
+        stats = get_dashboard_stats()
+        self.assertEqual((stats['user_count'], stats['active_user_count']), (2, 1))
+        self.user.groups.add(self.group)
+        self.assertEqual(get_dashboard_stats()['groups'][0]['member_count'], 1)
+
+    def test_last_login_update_keeps_cache(self):
+        get_dashboard_stats()
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'])
+    def test_recomputed_on_primary_inside_replica_views(self):
+        # replica_0 没有对应的连接，任何被路由到副本的查询都会出错
+        stats = use_read_replica(lambda request: get_dashboard_stats())(RequestFactory().get('/'))
+        self.assertEqual(stats['user_count'], 1)
+
+
+class GroupListQueryCountTests(TestCase):
+    """group_list 的查询次数与用户组数量无关"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_login(self.admin)
+
+    def add_groups(self, count):
+        start = Group.objects.count()
+        groups = Group.objects.bulk_create([Group(name=f'group{start + i:03d}') for i in range(count)])
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=self.admin.id, group_id=group.id) for group in groups
+        ])
+
+    def get_group_list(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('demo:group_list'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_pinned(self):
+        self.add_groups(2)
+        _, small = self.get_group_list()
+        self.add_groups(40)
+        response, large = self.get_group_list()
+        self.assertEqual(small, large)
+        self.assertTrue(all(group.member_count == 1 for group in response.context['groups']))
+        self.assertEqual(response.context['group_count'], 42)
+
+
+class ClientInfoMemoizationTests(TestCase):
+    """日志客户端信息的请求级与进程级缓存"""
+
+    def test_descriptor_computed_once_per_request(self):
+        request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0 (Windows NT 10.0) Chrome/120.0')
+        info, client = get_client_descriptor(request)
+        self.assertEqual(client, '[IP:127.0.0.1|Browser:Chrome/Windows]')
+        request.META['HTTP_USER_AGENT'] = 'changed'
+        self.assertIs(get_client_descriptor(request)[0], info)
+
+    def test_user_agent_classification_is_cached(self):
+        classify_user_agent.cache_clear()
+        classify_user_agent('Mozilla/5.0 (X11; Linux x86_64) Firefox/121.0')
+        classify_user_agent('Mozilla/5.0 (X11; Linux x86_64) Firefox/121.0')
+        self.assertEqual(classify_user_agent.cache_info().hits, 1)
+
+
+class RequestLogBufferTests(TestCase):
+    """请求级日志合并"""
+
+    def setUp(self):
+        self.records = []
+        self.sink_id = logger.add(lambda message: self.records.append(message.record), level='DEBUG')
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_login(self.admin)
+
+    def tearDown(self):
+        logger.remove(self.sink_id)
+
+    def categories(self):
+        return [record['extra'].get('category') for record in self.records]
+
+    @override_settings(LOG_REQUEST_BATCHING=True)
+    def test_operation_lines_are_flushed_as_one_record(self):
+        self.client.get(reverse('demo:users_api'), {'limit': 5})
+        self.assertEqual(self.categories(), ['operation'])
+        self.assertEqual(self.records[0]['extra']['batched'], 2)
+
+    @override_settings(LOG_REQUEST_BATCHING=True, LOG_SECURITY_UNBUFFERED=True)
+    def test_security_events_are_written_immediately(self):
+        self.client.get(reverse('demo:test_logging'))
+        self.assertEqual(self.categories(), ['security', 'audit', 'operation'])
+
+    def test_disabled_by_default(self):
+        self.client.get(reverse('demo:users_api'), {'limit': 5})
+        self.assertEqual(self.categories(), ['operation', 'operation'])
+
+
+class RequestMetricsTests(TestCase):
+    """请求指标中间件与 /metrics/ 接口"""
+
+    def setUp(self):
+        registry.reset()
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+
+    def test_records_view_latency_and_queries(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse('demo:users_api'), {'limit': 5})
+        body = self.client.get(reverse('demo:metrics')).content.decode()
+        self.assertIn('demo_request_duration_seconds_count{view="demo:users_api"} 1', body)
+        self.assertIn('# TYPE demo_request_db_queries histogram', body)
+        self.assertNotIn('demo_request_db_queries_sum{view="demo:users_api"} 0.000000', body)
+
+    def test_streaming_queries_are_counted(self):
+        self.client.force_login(self.admin)
+        b''.join(self.client.get(reverse('demo:users_api')).streaming_content)
+        body = self.client.get(reverse('demo:metrics')).content.decode()
+        self.assertIn('demo_request_db_queries_count{view="demo:users_api"} 1', body)
+
+    def test_requires_superuser_or_token(self):
+        self.assertEqual(self.client.get(reverse('demo:metrics')).status_code, 403)
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(reverse('demo:metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class BulkImportTests(TestCase):
+    """批量导入用户"""
+
+    def setUp(self):
+        self.group = Group.objects.create(name='普通用户')
+        User.objects.create_user(username='existing')
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_login(self.admin)
+
+    def test_jsonl_import_reports_row_errors(self):
+        lines = [
+            {'username': 'alice', 'password': 'pw-alice', 'group': '普通用户'},
+            {'username': 'existing', 'password': 'pw'},
+            {'username': 'alice', 'password': 'pw'},
+            {'username': 'bob', 'password': 'pw-bob', 'group_id': self.group.id, 'is_active': False},
+            {'username': 'carol', 'password': 'pw', 'group': 'missing'},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+        data = self.client.post(reverse('demo:user_import'), body, content_type='application/x-ndjson').json()
+        self.assertEqual((data['total'], data['created'], data['failed']), (6, 2, 4))
+        self.assertEqual([error['line'] for error in data['errors']], [6, 2, 3, 5])
+        bob = User.objects.get(username='bob')
+        self.assertFalse(bob.is_active)
+        self.assertTrue(bob.check_password('pw-bob'))
+        self.assertEqual(set(self.group.user_set.values_list('username', flat=True)), {'alice', 'bob'})
+
+    def test_conflict_inside_batch_only_fails_that_row(self):
+        def racing_hash(passwords):
+            # 检查已存在用户名之后、写入之前，另一个请求创建了同名用户
+            User.objects.create_user(username='racer')
+            return [make_password(password) for password in passwords]
+
+        body = ''.join(json.dumps({'username': name, 'password': 'pw'}) + '\n' for name in ('ann', 'racer', 'ben'))
+        with mock.patch('demo.bulk_import.hash_passwords', side_effect=racing_hash):
+            data = self.client.post(reverse('demo:user_import'), body, content_type='application/x-ndjson').json()
+        self.assertEqual((data['created'], data['failed']), (2, 1))
+        self.assertEqual((data['errors'][0]['line'], data['errors'][0]['username']), (2, 'racer'))
+        self.assertEqual(User.objects.filter(username__in=['ann', 'ben']).count(), 2)
+
+    def test_usernames_differing_only_in_case_are_duplicates(self):
+        body = ''.join(json.dumps({'username': name, 'password': 'pw'}) + '\n' for name in ('Existing', 'dan', 'DAN'))
+        data = self.client.post(reverse('demo:user_import'), body, content_type='application/x-ndjson').json()
+        self.assertEqual((data['created'], data['failed']), (1, 2))
+        self.assertEqual([(error['line'], error['error']) for error in data['errors']],
+                         [(1, '用户名已存在'), (3, '导入数据中用户名重复')])
+
+    @override_settings(BULK_IMPORT_MAX_ROWS=3)
+    def test_oversized_upload_is_rejected_without_importing(self):
+        body = ''.join(json.dumps({'username': f'big{i}', 'password': 'pw'}) + '\n' for i in range(4))
+        response = self.client.post(reverse('demo:user_import'), body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('import_users', response.json()['message'])
+        self.assertFalse(User.objects.filter(username__startswith='big').exists())
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_csv_import_hashes_in_process_pool(self):
+        body = 'username,password,email\n' + ''.join(f'csv{i},pw{i},c{i}@example.com\n' for i in range(5))
+        data = self.client.post(reverse('demo:user_import') + '?format=csv', body, content_type='text/plain').json()
+        self.assertEqual(data['created'], 5)
+        self.assertTrue(User.objects.get(username='csv3').check_password('pw3'))
+
+
+class BulkUserActionTests(TestCase):
+    """批量用户操作"""
+
+    def setUp(self):
+        self.super_group = Group.objects.create(name='超级管理员')
+        self.admin_group = Group.objects.create(name='管理员')
+        self.user_group = Group.objects.create(name='普通用户')
+        self.members = [User.objects.create_user(username=f'member{i}') for i in range(3)]
+        for member in self.members:
+            member.groups.add(self.user_group)
+        self.other_admin = User.objects.create_user(username='other_admin')
+        self.other_admin.groups.add(self.admin_group)
+        self.operator = User.objects.create_user(username='operator')
+        self.operator.groups.add(self.admin_group)
+        self.operator.user_permissions.add(*Permission.objects.filter(codename__in=['change_user', 'delete_user']))
+        self.client.force_login(self.operator)
+
+    def post(self, payload):
+        return self.client.post(reverse('demo:user_bulk_action'), json.dumps(payload), content_type='application/json')
+
+    def test_deactivate_and_move_group(self):
+        ids = [member.id for member in self.members]
+        response = self.post({'action': 'deactivate', 'user_ids': ids + [999999]})
+        self.assertEqual(response.json()['not_found'], [999999])
+        self.assertFalse(User.objects.filter(pk__in=ids, is_active=True).exists())
+
+        response = self.post({'action': 'move_group', 'user_ids': ids[:2], 'group_id': self.admin_group.id})
+        self.assertEqual(response.json()['affected'], 2)
+        self.assertEqual(self.admin_group.user_set.filter(pk__in=ids).count(), 2)
+        self.assertEqual(self.user_group.user_set.filter(pk__in=ids).count(), 1)
+
+    def test_plain_admin_may_only_touch_regular_users(self):
+        response = self.post({'action': 'delete', 'user_ids': [self.members[0].id, self.other_admin.id]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['forbidden'], [self.other_admin.id])
+        self.assertEqual(User.objects.filter(pk=self.members[0].id).count(), 1)
+
+    def test_cannot_include_self(self):
+        response = self.post({'action': 'deactivate', 'user_ids': [self.operator.id]})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class PasswordHashingOffloadTests(TestCase):
+    """密码哈希进程池与有界队列"""
+
+    def setUp(self):
+        Group.objects.create(name='普通用户')
+        User.objects.create_user(username='alice', password='pw-alice')
+
+    def test_login_and_register_through_hashing_backend(self):
+        response = self.client.post(reverse('demo:login'), {'username': 'alice', 'password': 'pw-alice'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(int(self.client.session['_auth_user_id']), User.objects.get(username='alice').pk)
+
+        self.client.logout()
+        self.client.post(reverse('demo:register'), {
+            'username': 'bob', 'password1': 'Pw-bob-12345', 'password2': 'Pw-bob-12345',
+        })
+        bob = User.objects.get(username='bob')
+        self.assertTrue(bob.check_password('Pw-bob-12345'))
+        self.assertTrue(bob.groups.filter(name='普通用户').exists())
+
+    def test_full_queue_returns_503(self):
+        with mock.patch('demo.hashing._run', side_effect=HashingBusy):
+            response = self.client.post(reverse('demo:login'), {'username': 'alice', 'password': 'pw-alice'})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+
+            self.client.force_login(User.objects.create_superuser(username='admin', password='admin'))
+            response = self.client.post(reverse('demo:user_create'), json.dumps({
+                'username': 'carol', 'password': 'pw-carol',
+            }), content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username='carol').exists())
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2, PASSWORD_HASHING_CHUNK_SIZE=3)
+    def test_bulk_hashing_goes_through_bounded_queue_in_chunks(self):
+        passwords = [f'pw{i}' for i in range(7)]
+        with mock.patch('demo.hashing._submit', wraps=hashing._submit) as submit:
+            hashes = hashing.hash_passwords(passwords)
+        self.assertEqual(submit.call_count, 3)
+        self.assertTrue(all(check_password(raw, encoded) for raw, encoded in zip(passwords, hashes)))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=None, WEB_CONCURRENCY=4)
+    def test_default_pool_size_shares_cores_between_web_workers(self):
+        with mock.patch('os.cpu_count', return_value=8):
+            self.assertEqual(hashing.hashing_workers(), 2)
+        with mock.patch('os.cpu_count', return_value=2):
+            self.assertEqual(hashing.hashing_workers(), 1)
+
+    @override_settings(PASSWORD_HASHING_RESULT_TIMEOUT=0.01)
+    def test_waiting_for_result_times_out(self):
+        with self.assertRaises(HashingBusy):
+            hashing._result(Future(), make_password, ('pw',))
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class HasherProfileTests(TestCase):
+    """密码哈希方案与登录时重新哈希"""
+
+    def setUp(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user = User.objects.create_user(username='alice', password='pw-alice')
+
+    def login(self):
+        return self.client.post(reverse('demo:login'), {'username': 'alice', 'password': 'pw-alice'})
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=2000)
+    def test_login_upgrades_iterations(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.login().status_code, 302)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    @override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10, PASSWORD_HASHERS=[
+        'demo.hashers.TunedScryptPasswordHasher', 'demo.hashers.TunedPBKDF2PasswordHasher',
+    ])
+    def test_login_migrates_to_preferred_profile(self):
+        self.assertEqual(self.login().status_code, 302)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+        self.assertTrue(self.user.check_password('pw-alice'))
+
+
+class AsyncEndpointTests(TestCase):
+    """只读JSON接口的异步实现"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='普通用户')
+        cls.viewer = User.objects.create_user(username='viewer')
+        cls.viewer.user_permissions.add(*Permission.objects.filter(codename__in=['view_user', 'view_group']))
+        for i in range(3):
+            User.objects.create_user(username=f'member{i}').groups.add(cls.group)
+
+    async def test_asgi_streams_with_async_iterator(self):
+        await sync_to_async(self.async_client.force_login)(self.viewer)
+        response = await self.async_client.get(reverse('demo:group_members', args=[self.group.id]))
+        self.assertTrue(response.is_async)
+        data = await aread_streaming_json(response)
+        self.assertEqual([member['username'] for member in data['members']], ['member0', 'member1', 'member2'])
+
+        response = await self.async_client.get(reverse('demo:users_api') + '?limit=2')
+        self.assertEqual([user['username'] for user in json.loads(response.content)['users']],
+                         ['member0', 'member1'])
+
+    async def test_permission_and_lookup(self):
+        response = await self.async_client.get(reverse('demo:group_detail_api', args=[self.group.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(reverse('demo:login')))
+
+        await sync_to_async(self.async_client.force_login)(self.viewer)
+        response = await self.async_client.get(reverse('demo:group_detail_api', args=[self.group.id]))
+        self.assertEqual(json.loads(response.content), {'name': '普通用户', 'user_count': 3})
+        response = await self.async_client.get(reverse('demo:user_detail', args=[999999]) + '?format=json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_wsgi_keeps_sync_stream(self):
+        self.client.force_login(self.viewer)
+        response = self.client.get(reverse('demo:group_members', args=[self.group.id]))
+        self.assertFalse(response.is_async)
+        response = self.client.get(reverse('demo:check_username') + '?username=member0')
+        self.assertEqual(response.json()['valid'], False)
+
+
+@override_settings(USERNAME_CHECK_RATE_LIMIT=30)
+class CheckUsernameTests(TestCase):
+    """用户名可用性检查的缓存与限流"""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='Alice')
+
+    def check(self, username, **extra):
+        return self.client.get(reverse('demo:check_username'), {'username': username}, **extra)
+
+    def test_results_are_cached_and_invalidated(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(self.check('alice').json()['valid'])
+            self.assertFalse(self.check('ALICE').json()['valid'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.check('a-b').json()['message'], '用户名只能包含字母、数字和下划线')
+
+        self.assertTrue(self.check('bob').json()['valid'])
+        bob = User.objects.create_user(username='bob')
+        self.assertFalse(self.check('bob').json()['valid'])
+
+        bob.username = 'robert'
+        bob.save()
+        invalidate_usernames(['bob'])
+        self.assertTrue(self.check('bob').json()['valid'])
+        self.assertFalse(self.check('Robert').json()['valid'])
+
+    def test_taken_lookup_uses_lower_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.check('ALICE')
+        sql = next(q['sql'] for q in ctx.captured_queries if 'auth_user' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('demo_user_username_lower', plan)
+
+    def test_register_rejects_names_the_checker_reports_taken(self):
+        Group.objects.create(name='普通用户')
+        self.assertFalse(self.check('ALICE').json()['valid'])
+        response = self.client.post(reverse('demo:register'), {
+            'username': 'ALICE', 'password1': 'pw-alice-2', 'password2': 'pw-alice-2',
+        })
+        self.assertContains(response, '用户名已存在')
+        self.assertEqual(User.objects.filter(username__iexact='alice').count(), 1)
+
+    def test_admin_create_and_rename_reject_case_variants(self):
+        admin = User.objects.create_superuser(username='admin', password='admin')
+        bob = User.objects.create_user(username='bob')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('demo:user_create'), json.dumps({
+            'username': 'ALICE', 'email': '', 'password': 'pw'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('demo:user_update', args=[bob.pk]), json.dumps({
+            'username': 'alice'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('demo:user_update', args=[bob.pk]), json.dumps({
+            'username': 'Bob'}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.filter(username__iexact='alice').count(), 1)
+
+    @override_settings(USERNAME_CHECK_RATE_LIMIT=3)
+    def test_rate_limited_per_ip(self):
+        for _ in range(3):
+            self.assertEqual(self.check('carol').status_code, 200)
+        response = self.check('carol')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.check('carol', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    @override_settings(USERNAME_CHECK_RATE_LIMIT=2)
+    def test_forwarded_for_cannot_rotate_buckets(self):
+        for index in range(2):
+            self.check('carol', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}')
+        self.assertEqual(self.check('carol', HTTP_X_FORWARDED_FOR='203.0.113.9').status_code, 429)
+
+        with self.settings(TRUSTED_PROXY_COUNT=1):
+            # 只有代理追加的最后一个条目用于识别客户端
+            for _ in range(2):
+                self.check('carol', HTTP_X_FORWARDED_FOR='1.1.1.1, 198.51.100.7')
+            self.assertEqual(self.check('carol', HTTP_X_FORWARDED_FOR='2.2.2.2, 198.51.100.7').status_code, 429)
+            self.assertEqual(self.check('carol', HTTP_X_FORWARDED_FOR='198.51.100.8').status_code, 200)
+
+
+class DatabaseConfigTests(TestCase):
+    """DATABASE_URL 解析与SQLite连接参数"""
+
+    def test_parse_urls(self):
+        config = database_from_url('postgres://demo:p%40ss@db:6432/hub?pool=pgbouncer&sslmode=require', '/srv')
+        self.assertEqual(
+            {key: config[key] for key in ('ENGINE', 'NAME', 'USER', 'PASSWORD', 'HOST', 'PORT', 'OPTIONS')},
+            {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'hub', 'USER': 'demo', 'PASSWORD': 'p@ss',
+             'HOST': 'db', 'PORT': '6432', 'OPTIONS': {'sslmode': 'require'}},
+        )
+        self.assertTrue(config['DISABLE_SERVER_SIDE_CURSORS'])
+
+        self.assertEqual(database_from_url('sqlite:///data/db.sqlite3', '/srv')['NAME'], '/srv/data/db.sqlite3')
+        self.assertEqual(database_from_url('sqlite:////tmp/x.sqlite3', '/srv')['NAME'], '/tmp/x.sqlite3')
+        self.assertEqual(database_from_url('sqlite:///x.sqlite3', '/srv', sqlite_wal=False)['OPTIONS'], {})
+        with self.assertRaises(ValueError):
+            database_from_url('mysql://localhost/demo', '/srv')
+
+    def test_sqlite_pragmas_applied_on_connect(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class ReplicaRoutingTests(TestCase):
+    """只读副本路由与写后固定主库"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def routed_alias(self, request, model=User):
+        @use_read_replica
+        def view(request):
+            return self.router.db_for_read(model)
+        return view(request)
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'])
+    def test_reads_in_decorated_views_use_replica(self):
+        request = self.factory.get('/')
+        self.assertEqual(self.routed_alias(request), 'replica_0')
+        self.assertIsNone(self.routed_alias(request, model=Session))
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        self.assertFalse(self.router.allow_migrate('replica_0', 'auth'))
+
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertIsNone(self.routed_alias(request))
+
+    def test_without_replicas_reads_stay_on_primary(self):
+        self.assertIsNone(self.routed_alias(self.factory.get('/')))
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'], REPLICA_STICKY_SECONDS=7)
+    def test_writes_pin_client_to_primary(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='admin'))
+        response = self.client.post(reverse('demo:user_create'), json.dumps({
+            'username': 'carol', 'password': 'pw-carol',
+        }), content_type='application/json')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 7)
+
+        response = self.client.post(reverse('demo:user_create'), json.dumps({
+            'username': 'carol', 'password': 'pw-carol',
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class SessionEngineTests(TestCase):
+    """会话存储配置"""
+
+    def session_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        return [query for query in ctx.captured_queries if 'django_session' in query['sql']]
+
+    def test_cached_db_serves_sessions_from_cache(self):
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db')
+        self.client.force_login(User.objects.create_superuser(username='admin', password='admin'))
+        url = reverse('demo:group_list')
+        self.session_queries(url)
+        self.assertEqual(self.session_queries(url), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_db_engine_reads_session_table(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='admin'))
+        self.assertEqual(len(self.session_queries(reverse('demo:group_list'))), 1)
+
+
+class AuthorizationCacheTests(TestCase):
+    """授权信息缓存"""
+
+    def setUp(self):
+        self.super_group = Group.objects.create(name='超级管理员')
+        self.user_group = Group.objects.create(name='普通用户')
+        self.user = User.objects.create_user(username='member')
+        self.user.groups.add(self.user_group)
+
+    def fresh(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_warm_permission_checks_skip_queries(self):
+        self.user_group.permissions.add(Permission.objects.get(codename='change_user'))
+        self.assertTrue(self.fresh().has_perm('auth.change_user'))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('auth.change_user'))
+            self.assertFalse(user.has_perm('auth.delete_user'))
+            self.assertFalse(is_superadmin(user))
+
+    def test_membership_and_permission_changes_invalidate(self):
+        self.assertEqual(get_authorization(self.fresh()).role, '普通用户')
+        self.user.groups.add(self.super_group)
+        self.assertTrue(is_superadmin(self.fresh()))
+        self.super_group.user_set.remove(self.user)
+        self.assertFalse(is_superadmin(self.fresh()))
+
+        self.assertFalse(self.fresh().has_perm('auth.delete_user'))
+        self.user_group.permissions.add(Permission.objects.get(codename='delete_user'))
+        self.assertTrue(self.fresh().has_perm('auth.delete_user'))
+
+    def test_bulk_move_group_invalidates(self):
+        operator = User.objects.create_superuser(username='admin', password='admin')
+        operator.groups.add(self.super_group)
+        self.client.force_login(operator)
+        self.assertFalse(is_superadmin(self.fresh()))
+        self.client.post(reverse('demo:user_bulk_action'),
+                         json.dumps({'action': 'move_group', 'user_ids': [self.user.pk], 'group_id': self.super_group.id}),
+                         content_type='application/json')
+        self.assertTrue(is_superadmin(self.fresh()))
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'])
+    def test_recomputed_on_primary_inside_replica_views(self):
+        self.user_group.permissions.add(Permission.objects.get(codename='change_user'))
+        user = self.fresh()
+
+        @use_read_replica
+        def view(request):
+            return user.has_perm('auth.change_user'), is_superadmin(user)
+
+        # replica_0 没有对应的连接，任何被路由到副本的查询都会出错
+        self.assertEqual(ReplicaRouter().db_for_read(Permission), None)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(view(RequestFactory().get('/')), (True, False))
+        self.assertTrue(ctx.captured_queries)
+
+
+class ChangeFeedTests(TestCase):
+    """仪表盘增量刷新"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.group = Group.objects.create(name='普通用户')
+        self.kept = User.objects.create_user(username='kept')
+        self.doomed = User.objects.create_user(username='doomed')
+        self.client.force_login(self.admin)
+
+    def changes(self, since):
+        return self.client.get(reverse('demo:changes_api'), {'since': since}).json()
+
+    def test_versions_are_serialized_outside_sqlite(self):
+        cursor = mock.MagicMock()
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(connection, 'cursor', return_value=cursor):
+            changefeed._serialize_versions('default')
+        cursor.__enter__.return_value.execute.assert_called_once_with(
+            'LOCK TABLE "demo_changelogentry" IN SHARE ROW EXCLUSIVE MODE'
+        )
+
+    def test_entries_follow_the_signal_database(self):
+        with mock.patch('demo.signals.record_changes') as record:
+            user = User(username='elsewhere')
+            user.save(using='default')
+            self.group.user_set.add(user)
+        self.assertEqual(record.call_args_list[0].kwargs['using'], 'default')
+        self.assertTrue(all(call.kwargs.get('using') == 'default' for call in record.call_args_list))
+
+    def test_returns_changed_rows_and_tombstones(self):
+        since = latest_version()
+        User.objects.create_user(username='fresh')
+        self.group.user_set.add(self.kept)
+        doomed_id = self.doomed.pk
+        self.doomed.delete()
+
+        data = self.changes(since)
+        self.assertFalse(data['reset'])
+        self.assertEqual([row['username'] for row in data['users']], ['fresh', 'kept'])
+        self.assertEqual(data['users'][1]['group_name'], '普通用户')
+        self.assertEqual(data['deleted'], {'users': [doomed_id], 'groups': []})
+        self.assertEqual(data['stats']['groups'][0]['member_count'], 1)
+
+        data = self.changes(data['version'])
+        self.assertEqual((data['users'], data['deleted']['users']), ([], []))
+
+    def test_bulk_update_is_recorded(self):
+        self.group.user_set.add(self.kept)
+        since = latest_version()
+        self.client.post(reverse('demo:user_bulk_action'),
+                         json.dumps({'action': 'deactivate', 'user_ids': [self.kept.pk]}),
+                         content_type='application/json')
+        users = self.changes(since)['users']
+        self.assertEqual([(row['id'], row['is_active']) for row in users], [(self.kept.pk, False)])
+
+    def test_pruned_or_unknown_version_resets(self):
+        latest = latest_version()
+        ChangeLogEntry.objects.filter(id__lt=latest).delete()
+        self.assertTrue(self.changes(0)['reset'])
+        self.assertTrue(self.changes(latest + 100)['reset'])
+        self.assertFalse(self.changes(latest)['reset'])
+        self.assertEqual(self.client.get(reverse('demo:changes_api'), {'since': 'x'}).status_code, 400)
+
+
+class LiveEventsTests(TestCase):
+    """实时事件推送"""
+
+    def setUp(self):
+        reset_broadcaster()
+        self.addCleanup(reset_broadcaster)
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+
+    def create_user_committed(self, username):
+        with self.captureOnCommitCallbacks(execute=True):
+            return User.objects.create_user(username=username)
+
+    def test_wsgi_request_is_told_not_to_reconnect(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('demo:events')).status_code, 204)
+
+    @override_settings(EVENTS_MAX_AGE=0.05, EVENTS_HEARTBEAT=0.02)
+    async def test_asgi_stream_ends_after_max_age(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+        response = await self.async_client.get(reverse('demo:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertTrue(body.startswith(b'retry: '))
+        self.assertIn(b': ping', body)
+        self.assertEqual(get_broadcaster().subscriber_count, 0)
+
+    @override_settings(EVENTS_BACKEND='demo.events.LocalEventBackend')
+    async def test_local_backend_pushes_committed_changes(self):
+        stream = event_stream(max_age=5, heartbeat=5)
+        await stream.__anext__()
+        user = await sync_to_async(self.create_user_committed)('pushed')
+        message = (await stream.__anext__()).decode()
+        await stream.aclose()
+        self.assertIn('event: user.created\n', message)
+        self.assertEqual(json.loads(message.split('data: ')[1])['id'], user.pk)
+
+    @override_settings(EVENTS_POLL_INTERVAL=0.01)
+    async def test_change_log_backend_shares_other_workers_changes(self):
+        stream = event_stream(max_age=5, heartbeat=5)
+        await stream.__anext__()
+        await asyncio.sleep(0.05)
+        # 直接写入变更记录，相当于其他进程提交的修改（不经过本进程的 publish）
+        await ChangeLogEntry.objects.acreate(kind='group', object_id=42, action='deleted')
+        message = (await stream.__anext__()).decode()
+        await stream.aclose()
+        self.assertIn('event: group.deleted\n', message)
+
+
+class ConditionalGetTests(TestCase):
+    """JSON 读接口的 ETag/Last-Modified"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.group = Group.objects.create(name='普通用户')
+        self.member = User.objects.create_user(username='member')
+        self.group.user_set.add(self.member)
+        self.client.force_login(self.admin)
+
+    def revalidate(self, url, response, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **extra)
+
+    def test_unchanged_users_api_returns_304_without_main_query(self):
+        url = reverse('demo:users_api') + '?limit=10'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse(any('"auth_user"."username" >' in q['sql'] or 'ORDER BY "auth_user"."username"' in q['sql']
+                             for q in ctx.captured_queries))
+
+        self.member.email = 'member@example.com'
+        self.member.save()
+        third = self.revalidate(url, first)
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+
+    def test_group_endpoints_follow_membership_changes(self):
+        for name in ('demo:group_detail_api', 'demo:group_members'):
+            url = reverse(name, args=[self.group.pk])
+            first = self.client.get(url)
+            self.assertEqual(self.revalidate(url, first).status_code, 304)
+            self.group.user_set.remove(self.member)
+            self.assertEqual(self.revalidate(url, first).status_code, 200)
+            self.group.user_set.add(self.member)
+
+    def test_user_detail_json_tracks_last_login(self):
+        url = reverse('demo:user_detail', args=[self.member.pk])
+        first = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(self.revalidate(url, first, HTTP_ACCEPT='application/json').status_code, 304)
+        User.objects.filter(pk=self.member.pk).update(last_login=timezone.now())
+        self.assertEqual(self.revalidate(url, first, HTTP_ACCEPT='application/json').status_code, 200)
+        self.assertFalse(self.client.get(url).has_header('ETag'))
+
+
+class UserDirectoryQueryTests(TestCase):
+    """users_api 服务端搜索、筛选与排序"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='运维')
+        joined = timezone.now()
+        users = User.objects.bulk_create([
+            User(username='Alice', email='alice@example.com', date_joined=joined),
+            User(username='alfred', email='fred@example.com', date_joined=joined, is_active=False),
+            User(username='bob', email='ALBERT@example.com', date_joined=joined - timezone.timedelta(days=1)),
+            User(username='carol', email='carol@example.com', date_joined=joined - timezone.timedelta(days=2)),
+        ])
+        cls.group.user_set.add(users[0], users[3])
+        # 用户名不以搜索用到的前缀开头，不影响结果
+        cls.viewer = User.objects.create_user(username='viewer')
+        cls.viewer.user_permissions.add(Permission.objects.get(codename='view_user'))
+
+    def setUp(self):
+        self.client.force_login(self.viewer)
+
+    def usernames(self, **params):
+        response = self.client.get(reverse('demo:users_api'), {'limit': 10, **params})
+        self.assertEqual(response.status_code, 200)
+        return [user['username'] for user in response.json()['users']]
+
+    def test_q_is_case_insensitive_prefix_on_username_or_email(self):
+        self.assertEqual(self.usernames(q='AL'), ['Alice', 'alfred', 'bob'])
+        self.assertEqual(self.usernames(q='fred@'), ['alfred'])
+        self.assertEqual(self.usernames(q='lice'), [])
+
+    def test_q_matches_non_ascii_and_astral_prefixes(self):
+        User.objects.bulk_create([User(username='Élodie'), User(username='émile'), User(username='al😀x')])
+        self.assertEqual(self.usernames(q='É'), ['Élodie'])
+        self.assertEqual(self.usernames(q='ÉLO'), ['Élodie'])
+        self.assertEqual(self.usernames(q='é'), ['émile'])
+        self.assertIn('al😀x', self.usernames(q='AL'))
+
+    def test_group_and_active_filters(self):
+        self.assertEqual(self.usernames(group=self.group.pk), ['Alice', 'carol'])
+        self.assertEqual(self.usernames(is_active='false'), ['alfred'])
+        self.assertEqual(self.usernames(q='a', is_active='true'), ['Alice', 'bob'])
+
+    def test_descending_date_joined_pages_with_cursor(self):
+        expected = list(User.objects.order_by('-date_joined', '-id').values_list('username', flat=True))
+        seen = []
+        params = {'limit': 1, 'ordering': '-date_joined'}
+        while True:
+            data = self.client.get(reverse('demo:users_api'), params).json()
+            seen.extend(user['username'] for user in data['users'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_parameters_return_400(self):
+        for params in ({'ordering': 'password'}, {'group': 'x'}, {'is_active': 'maybe'}, {'q': 'a' * 151}):
+            response = self.client.get(reverse('demo:users_api'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+@override_settings(DASHBOARD_PAGE_SIZE=10)
+class DashboardRenderTests(TestCase):
+    """仪表盘首屏只渲染第一页用户"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='admin')
+        self.group = Group.objects.create(name='普通用户')
+        self.client.force_login(self.admin)
+
+    def add_users(self, count):
+        start = User.objects.count()
+        users = User.objects.bulk_create([User(username=f'user{start + i:04d}') for i in range(count)])
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=user.id, group_id=self.group.id) for user in users
+        ])
+
+    def get_home(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('demo:home'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_renders_first_page_with_cursor(self):
+        self.add_users(5)
+        _, small = self.get_home()
+        self.add_users(60)
+        response, large = self.get_home()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context['users']), 10)
+        self.assertContains(response, '<tr data-user-id=', count=10)
+        self.assertIsNotNone(response.context['dashboard_state']['nextCursor'])
+        self.assertEqual(response.context['users'][1]['group_name'], '普通用户')
+
+    def test_api_rows_match_server_rendered_rows(self):
+        User.objects.create_user(username='ann', first_name='Ann', last_name='Lee')
+        rendered = self.get_home()[0].context['users']
+        api = self.client.get(reverse('demo:users_api'), {'limit': 10}).json()['users']
+        streamed = read_streaming_json(self.client.get(reverse('demo:users_api')))['users']
+        self.assertEqual(api, rendered)
+        self.assertEqual(streamed, rendered)
+        self.assertEqual(api[1]['full_name'], 'Ann Lee')
+
+    def test_group_fragment_follows_changes(self):
+        self.get_home()
+        Group.objects.create(name='运维')
+        self.assertContains(self.get_home()[0], '运维')
+
+    def test_templates_use_cached_loader(self):
+        loaders = settings.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(loaders[0][0], 'django.template.loaders.cached.Loader')
@@ -9,6 +9,7 @@ app_name = 'demo'
 urlpatterns = [
     path('init/<str:password>/', system_views.init_system, name='init_system'),
     path('test-logging/', system_views.test_logging, name='test_logging'),
+    path('metrics/', system_views.metrics, name='metrics'),
     
     path('', auth_views.home, name='home'),
     path('login/', auth_views.login_view, name='login'),
@@ -18,8 +19,12 @@ urlpatterns = [
     
     # API endpoints
     path('users/api/', user_views.users_api, name='users_api'),
+    path('changes/', user_views.changes_api, name='changes_api'),
+    path('events/', user_views.events, name='events'),
     path('users/', user_views.user_list, name='user_list'),
     path('users/create/', user_api.user_create, name='user_create'),
+    path('users/import/', user_api.user_import, name='user_import'),
+    path('users/bulk/', user_api.user_bulk_action, name='user_bulk_action'),
     path('users/<int:user_id>/', user_views.user_detail, name='user_detail'),
     path('users/<int:user_id>/update/', user_api.user_update, name='user_update'),
     path('users/<int:user_id>/delete/', user_api.user_delete, name='user_delete'),
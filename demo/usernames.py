@@ -0,0 +1,131 @@
+"""
+用户名可用性检查模块
+
+注册页面在输入时实时检查用户名。格式校验使用预编译的正则表达式，
+是否已被占用的结果按小写用户名缓存一小段时间（USERNAME_CHECK_TIMEOUT 秒），
+用户创建、改名或删除时由信号处理器清除对应缓存。
+
+占用查询按 LOWER(username) 比较，使用 demo_user_username_lower 表达式索引
+（migrations/0004_user_directory_indexes）；username__iexact 在 SQLite 上无法使用索引，会扫描全表。
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db.models.functions import Lower
+
+from .db import database_lower
+
+USERNAME_MIN_LENGTH = 3
+USERNAME_MAX_LENGTH = 20
+USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_]+\Z')
+
+
+def validate_username(username):
+    """
+    校验注册用户名的格式
+
+    参数:
+        username (str): 已去除首尾空白的用户名
+
+    返回:
+        str or None: 错误信息，格式正确时返回 None
+    """
+    if not username:
+        return '用户名不能为空'
+    if len(username) < USERNAME_MIN_LENGTH:
+        return f'用户名至少需要{USERNAME_MIN_LENGTH}个字符'
+    if len(username) > USERNAME_MAX_LENGTH:
+        return f'用户名不能超过{USERNAME_MAX_LENGTH}个字符'
+    if not USERNAME_PATTERN.match(username):
+        return '用户名只能包含字母、数字和下划线'
+    return None
+
+
+def _cache():
+    return caches[getattr(settings, 'USERNAME_CHECK_CACHE', 'default')]
+
+
+def username_key(username):
+    """
+    用户名的比较键（按数据库 LOWER() 的规则转换为小写）
+
+    参数:
+        username (str): 用户名
+
+    返回:
+        str: 比较键，两个用户名的比较键相同即视为同一用户名
+    """
+    return database_lower(username, User.objects.db)
+
+
+def _taken_queryset(username, exclude_id=None):
+    queryset = User.objects.alias(lower=Lower('username')).filter(lower=username_key(username))
+    if exclude_id is not None:
+        queryset = queryset.exclude(pk=exclude_id)
+    return queryset
+
+
+def _cache_key(username):
+    return f'demo:username_taken:{username.lower()}'
+
+
+async def ausername_taken(username):
+    """
+    用户名（不区分大小写）是否已被占用，结果会被缓存
+
+    参数:
+        username (str): 格式已校验的用户名
+
+    返回:
+        bool: 已被占用时为 True
+    """
+    cache = _cache()
+    key = _cache_key(username)
+    taken = await cache.aget(key)
+    if taken is None:
+        taken = await _taken_queryset(username).aexists()
+        await cache.aset(key, taken, timeout=getattr(settings, 'USERNAME_CHECK_TIMEOUT', 30))
+    return taken
+
+
+def username_taken(username, exclude_id=None):
+    """
+    用户名（不区分大小写）是否已被占用，不读缓存
+
+    注册时使用，与 ausername_taken 的判断规则一致。
+
+    参数:
+        username (str): 用户名
+        exclude_id (int, 可选): 不参与比较的用户ID（改名时传入当前用户）
+
+    返回:
+        bool: 已被占用时为 True
+    """
+    return _taken_queryset(username, exclude_id).exists()
+
+
+def taken_usernames(usernames):
+    """
+    一次查询找出已被占用的用户名
+
+    参数:
+        usernames (iterable): 用户名
+
+    返回:
+        set: 已被占用的用户名的比较键（username_key）
+    """
+    keys = {username_key(username) for username in usernames if username}
+    if not keys:
+        return set()
+    return set(User.objects.annotate(lower=Lower('username')).filter(lower__in=keys)
+               .values_list('lower', flat=True))
+
+
+def invalidate_usernames(usernames):
+    """清除指定用户名的可用性缓存"""
+    keys = [_cache_key(username) for username in usernames if username]
+    if keys:
+        _cache().delete_many(keys)
@@ -1,18 +1,35 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.contrib.auth.models import User, Group
+from django.contrib.auth.models import User
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
-from django.db.models import Count
 from django.core.serializers.json import DjangoJSONEncoder
 import json
-import re
 
 # 导入日志模块
-from ..logger import logger, log_security, log_operation
+from ..logger import logger, log_security, log_audit, log_operation
+from ..ratelimit import acheck_rate_limit, client_ip
+from ..usernames import ausername_taken, username_taken, validate_username
+from ..stats import get_dashboard_stats
+from ..hashing import HashingBusy, set_password
+from ..routers import use_read_replica
+from ..authz import ROLE_USER, well_known_group_id
+from ..changefeed import latest_version
+from ..api.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from ..api.serializers import serialize_user_list
+
+
+def _hashing_busy(request, template_name, context, username):
+    """密码哈希队列已满时快速返回503"""
+    log_security(f"密码哈希队列已满，拒绝请求: {username}", request, level="WARNING")
+    messages.error(request, '服务器繁忙，请稍后重试')
+    response = render(request, template_name, context, status=503)
+    response['Retry-After'] = str(HashingBusy.retry_after)
+    return response
 
 
 def login_view(request):
@@ -22,7 +39,10 @@ def login_view(request):
         remember_me = request.POST.get('remember_me') == 'on'
         log_security(f"用户尝试登录: {username}, 记住我: {remember_me}", request)
         
-        user = authenticate(request, username=username, password=password)
+        try:
+            user = authenticate(request, username=username, password=password)
+        except HashingBusy:
+            return _hashing_busy(request, 'demo/login.html', {'title': '用户登录'}, username)
         
         if user is not None:
             login(request, user)
@@ -35,6 +55,8 @@ def login_view(request):
                 request.session.set_expiry(0)
             
             log_security(f"用户登录成功: {username}", request)
+            if getattr(user, 'password_rehashed', False):
+                log_audit(f"用户密码哈希已升级: {username} -> {user.password.split('$', 1)[0]}", request, context="authentication")
             return redirect('demo:home')
         else:
             log_security(f"用户登录失败: {username} - 用户名或密码错误", request)
@@ -57,21 +79,25 @@ def register_view(request):
             messages.error(request, '两次输入的密码不一致')
             return render(request, 'demo/register.html', {'title': '用户注册'})
 
-        if User.objects.filter(username=username).exists():
+        # 与注册页实时检查（check_username）一致，不区分大小写
+        if username_taken(username or ''):
             log_security(f"用户注册失败: {username} - 用户名已存在", request)
             messages.error(request, '用户名已存在')
             return render(request, 'demo/register.html', {'title': '用户注册'})
 
         try:
-            user = User.objects.create_user(username=username, password=password1)
+            user = User(username=User.normalize_username(username))
+            set_password(user, password1)
+            user.save()
     
-            user_group = Group.objects.get(name='普通用户')
-            user.groups.add(user_group)
+            user.groups.add(well_known_group_id(ROLE_USER))
             user.save()
             
             login(request, user)
             log_security(f"用户注册成功: {username}", request)
             return redirect('demo:home')
+        except HashingBusy:
+            return _hashing_busy(request, 'demo/register.html', {'title': '用户注册'}, username)
         except Exception as e:
             log_security(f"用户注册失败: {username} - {str(e)}", request)
             messages.error(request, '注册失败，请稍后重试')
@@ -81,26 +107,33 @@ def register_view(request):
     return render(request, 'demo/register.html', {'title': '用户注册'})
 
 
-def check_username(request):
-    """检查用户名是否可用"""
-    username = request.GET.get('username', '').strip()
-
-    if not username:
-        return JsonResponse({'valid': False, 'message': '用户名不能为空'})
-
-    # 检查用户名长度
-    if len(username) < 3:
-        return JsonResponse({'valid': False, 'message': '用户名至少需要3个字符'})
-
-    if len(username) > 20:
-        return JsonResponse({'valid': False, 'message': '用户名不能超过20个字符'})
+async def check_username(request):
+    """
+    检查用户名是否可用
+
+    格式校验不访问数据库，占用情况按小写用户名缓存；同一客户端IP在
+    USERNAME_CHECK_RATE_WINDOW 秒内超过 USERNAME_CHECK_RATE_LIMIT 次请求时返回429。
+    客户端IP由 ratelimit.client_ip 解析，不信任客户端自行填写的 X-Forwarded-For。
+    """
+    retry_after = await acheck_rate_limit(
+        'check_username',
+        client_ip(request),
+        getattr(settings, 'USERNAME_CHECK_RATE_LIMIT', 30),
+        getattr(settings, 'USERNAME_CHECK_RATE_WINDOW', 10),
+        getattr(settings, 'USERNAME_CHECK_CACHE', 'default'),
+    )
+    if retry_after:
+        log_security("用户名检查请求过于频繁", request, level="WARNING")
+        response = JsonResponse({'valid': False, 'message': '请求过于频繁，请稍后重试'}, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
 
-    # 检查用户名格式
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
-        return JsonResponse({'valid': False, 'message': '用户名只能包含字母、数字和下划线'})
+    username = request.GET.get('username', '').strip()
+    error = validate_username(username)
+    if error:
+        return JsonResponse({'valid': False, 'message': error})
 
-    # 检查用户名是否已存在
-    if User.objects.filter(username=username).exists():
+    if await ausername_taken(username):
         return JsonResponse({'valid': False, 'message': '该用户名已被注册'})
 
     return JsonResponse({'valid': True, 'message': '用户名可用'})
@@ -108,17 +141,20 @@ def check_username(request):
 
 @login_required(login_url='demo:login')
 
+@use_read_replica
 def home(request):
     log_operation(f"User {request.user.username} opened dashboard", request)
     user_groups = list(request.user.groups.values_list('name', flat=True))
     log_operation(f"User {request.user.username} groups: {user_groups}", request)
 
-    users_qs = User.objects.prefetch_related('groups').order_by('username')
-    groups_qs = Group.objects.annotate(member_count=Count('user', distinct=True)).order_by('name')
-
-    user_count = users_qs.count()
-    group_count = groups_qs.count()
-    active_user_count = users_qs.filter(is_active=True).count()
+    # 先取版本号再读数据，渲染期间发生的变更会在下次增量刷新时重新下发
+    change_version = latest_version(using=User.objects.db)
+    # 只渲染第一页，后续页面由前端通过 /users/api/ 的游标按需加载
+    users, next_cursor = keyset_page(User.objects.all(), getattr(settings, 'DASHBOARD_PAGE_SIZE', DEFAULT_PAGE_SIZE))
+    stats = get_dashboard_stats()
+    user_count = stats['user_count']
+    group_count = stats['group_count']
+    active_user_count = stats['active_user_count']
 
     log_operation(
         f"Stats - users: {user_count}, active users: {active_user_count}, groups: {group_count}",
@@ -132,19 +168,24 @@ def home(request):
         'canChangeUser': request.user.has_perm('auth.change_user'),
         'canDeleteUser': request.user.has_perm('auth.delete_user'),
         'canChangeGroup': request.user.has_perm('auth.change_group'),
+        'changeVersion': change_version,
+        'nextCursor': next_cursor,
     }
     dashboard_state_json = json.dumps(dashboard_state, cls=DjangoJSONEncoder)
 
     context = {
         'title': '用户管理',
         'current_time': timezone.now(),
-        'users': users_qs,
-        'groups': groups_qs,
+        'users': serialize_user_list(users),
+        'groups': stats['groups'],
         'user_count': user_count,
         'active_user_count': active_user_count,
         'group_count': group_count,
         'dashboard_state': dashboard_state,
         'dashboard_state_json': dashboard_state_json,
+        # 统计与用户组片段缓存以变更版本号为键，任何用户/用户组变更都会生成新片段
+        'fragment_version': change_version,
+        'fragment_timeout': getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 300),
     }
     return render(request, 'demo/home.html', context)
 
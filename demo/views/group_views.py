@@ -1,36 +1,48 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import User, Group
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.db.models import Count
 from django.views.decorators.http import require_http_methods
 import json
 
 # 导入日志模块
 from ..logger import logger, log_operation
+from ..changefeed import change_etag
+from ..decorators import async_condition, async_permission_required
+from ..api.streaming import is_asgi_request, streaming_json_response
+from ..routers import use_read_replica
 
 
 @login_required(login_url='demo:login')
 @permission_required('auth.view_group', login_url='demo:login')
 def group_list(request):
     log_operation(f"管理员 {request.user.username} 访问用户组列表页面", request)
-    groups = Group.objects.all()
-    group_count = groups.count()
-    log_operation(f"当前用户组总数: {group_count}", request)
-    for group in groups:
-        member_count = group.user_set.count()
-        log_operation(f"用户组 '{group.name}' 成员数量: {member_count}", request)
+    groups = list(Group.objects.annotate(member_count=Count('user', distinct=True)).order_by('name'))
+    group_count = len(groups)
+    member_total = sum(group.member_count for group in groups)
+    log_operation(f"当前用户组总数: {group_count}, 成员关系总数: {member_total}", request)
     context = {
         'groups': groups,
+        'group_count': group_count,
         'title': '用户组管理'
     }
     return render(request, 'demo/group_list.html', context)
 
 
-@login_required(login_url='demo:login')
-@permission_required('auth.view_group', login_url='demo:login')
-def group_detail_api(request, group_id):
-    group = get_object_or_404(Group, pk=group_id)
-    user_count = group.user_set.count()
+async def _aget_group(group_id):
+    try:
+        return await Group.objects.aget(pk=group_id)
+    except Group.DoesNotExist:
+        raise Http404('No Group matches the given query.')
+
+
+@async_permission_required('auth.view_group', login_url='demo:login')
+@use_read_replica
+@async_condition(change_etag('group-detail'))
+async def group_detail_api(request, group_id):
+    group = await _aget_group(group_id)
+    user_count = await group.user_set.acount()
     log_operation(f"管理员 {request.user.username} 查看用户组详情: {group.name}", request)
     log_operation(f"用户组 '{group.name}' 成员数量: {user_count}", request)
     return JsonResponse({
@@ -39,24 +51,19 @@ def group_detail_api(request, group_id):
     })
 
 
-@login_required(login_url='demo:login')
-@permission_required('auth.view_group', login_url='demo:login')
-def group_members(request, group_id):
-    group = get_object_or_404(Group, pk=group_id)
+@async_permission_required('auth.view_group', login_url='demo:login')
+@use_read_replica
+@async_condition(change_etag('group-members'))
+async def group_members(request, group_id):
+    group = await _aget_group(group_id)
     members = group.user_set.all()
-    member_count = members.count()
-    active_count = members.filter(is_active=True).count()
+    member_count = await members.acount()
+    active_count = await members.filter(is_active=True).acount()
     log_operation(f"管理员 {request.user.username} 查看用户组成员: {group.name}", request)
     log_operation(f"用户组 '{group.name}' 成员统计: 总数 {member_count}, 激活 {active_count}", request)
-    return JsonResponse({
-        'group_name': group.name,
-        'members': [
-            {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'is_active': user.is_active
-            }
-            for user in members
-        ]
-    })
\ No newline at end of file
+    return streaming_json_response(
+        'members',
+        members.values('id', 'username', 'email', 'is_active'),
+        extra={'group_name': group.name},
+        asynchronous=is_asgi_request(request),
+    )
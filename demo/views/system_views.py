@@ -1,14 +1,17 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.models import User, Group
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import Permission
 from django.shortcuts import get_object_or_404
+import hmac
 import json
 
 # 导入日志模块
 from ..logger import logger, log_operation, log_audit, log_security
+from ..metrics import registry
 
 
 @require_http_methods(["GET"])
@@ -151,4 +154,24 @@ def test_logging(request):
     return JsonResponse({
         'status': 'success',
         'message': '日志记录测试完成'
-    })
\ No newline at end of file
+    })
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    请求指标接口（Prometheus文本格式）
+
+    访问权限：
+        - 已登录的超级管理员
+        - 或请求头 Authorization: Bearer <METRICS_TOKEN>（供Prometheus抓取）
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorized = request.user.is_authenticated and request.user.is_superuser
+    if not authorized and token:
+        authorized = hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized:
+        log_security("指标接口访问被拒绝", request, level="WARNING")
+        return JsonResponse({'status': 'error', 'message': '没有权限'}, status=403)
+
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
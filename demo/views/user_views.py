@@ -1,16 +1,26 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import User, Group
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 import json
 
 # 导入日志模块
 from ..logger import logger, log_operation, log_audit
+from ..decorators import aresolve_user, async_condition, async_permission_required
+from ..api.serializers import aserialize_user_list, serialize_user_row, user_rows
+from ..api.streaming import is_asgi_request, streaming_json_response
+from ..api.filters import InvalidFilter, filter_users
+from ..api.pagination import InvalidCursor, akeyset_page, parse_ordering, parse_page_size
+from ..routers import use_read_replica
+from ..changefeed import USER, change_etag, change_validators, collect_changes
+from ..events import event_stream
 
 
 @login_required(login_url='demo:login')
 @permission_required('auth.view_user', login_url='demo:login')
+@use_read_replica
 def user_list(request):
     log_operation(f"管理员 {request.user.username} 访问用户列表页面", request)
     users = User.objects.all()
@@ -26,14 +36,36 @@ def user_list(request):
     return render(request, 'demo/user_list.html', context)
 
 
-@login_required(login_url='demo:login')
-@permission_required('auth.view_user', login_url='demo:login')
-def user_detail(request, user_id):
-    user = get_object_or_404(User, pk=user_id)
+def _wants_json(request):
+    accept_header = request.headers.get('Accept', '')
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in accept_header or request.GET.get('format') == 'json'
+
+
+def _user_detail_validators(request, user_id):
+    """JSON 模式的校验值：用户变更版本号加上 last_login（登录不写变更记录）"""
+    if not _wants_json(request):
+        return None, None
+    rows = list(User.objects.filter(pk=user_id).values_list('last_login', flat=True)[:1])
+    if not rows:
+        return None, None
+    version, changed_at = change_validators((USER,))
+    last_login = rows[0]
+    etag = f"user-{user_id}-{version}-{int(last_login.timestamp()) if last_login else 0}"
+    last_modified = max(filter(None, [changed_at, last_login]), default=None)
+    return etag, last_modified
+
+
+@async_permission_required('auth.view_user', login_url='demo:login')
+@async_condition(_user_detail_validators)
+async def user_detail(request, user_id):
+    try:
+        user = await User.objects.aget(pk=user_id)
+    except User.DoesNotExist:
+        raise Http404('No User matches the given query.')
     log_operation(f"Admin {request.user.username} viewed user detail: {user.username}", request)
     log_operation(f"User {user.username} snapshot - email: {user.email or 'N/A'}, status: {'ACTIVE' if user.is_active else 'INACTIVE'}", request)
 
-    primary_group = user.groups.first()
+    primary_group = await user.groups.afirst()
     payload = {
         'status': 'success',
         'id': user.id,
@@ -49,10 +81,7 @@ def user_detail(request, user_id):
         'last_login': user.last_login.isoformat() if user.last_login else None
     }
 
-    accept_header = request.headers.get('Accept', '')
-    wants_json = request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in accept_header or request.GET.get('format') == 'json'
-
-    if wants_json:
+    if _wants_json(request):
         return JsonResponse(payload)
 
     context = {
@@ -60,22 +89,113 @@ def user_detail(request, user_id):
         'groups': Group.objects.all(),
         'title': '用户详情'
     }
-    return render(request, 'demo/user_detail.html', context)
-def users_api(request):
-    log_operation(f"管理员 {request.user.username} 请求用户数据API", request)
-    users = User.objects.all()
-    user_count = users.count()
-    active_count = users.filter(is_active=True).count()
-    log_operation(f"返回用户数据: 总数 {user_count}, 激活 {active_count}", request)
+    # 模板渲染会对查询集求值，放到线程中执行
+    return await sync_to_async(render)(request, 'demo/user_detail.html', context)
+
+
+@async_permission_required('auth.view_user', login_url='demo:login')
+@use_read_replica
+@async_condition(change_etag('users', (USER,)))
+async def users_api(request):
+    """
+    用户数据API
+
+    请求方法: GET
+    请求参数:
+        - limit (int, 可选): 每页条数，提供 limit 或 cursor 时启用键集分页
+        - cursor (str, 可选): 上一页返回的 next_cursor（翻页时其他参数需与第一页相同）
+        - q (str, 可选): 用户名或邮箱前缀，不区分大小写
+        - group (int, 可选): 用户组ID
+        - is_active (bool, 可选): 是否激活
+        - ordering (str, 可选): username（默认）、-username、date_joined、-date_joined
+
+    返回:
+        - 未分页: {'users': [...]}（流式输出）
+        - 分页: {'users': [...], 'next_cursor': str or None, 'has_more': bool}
+    """
+    user = await aresolve_user(request)
+    log_operation(f"管理员 {user.username} 请求用户数据API", request)
+    try:
+        users = filter_users(User.objects.all(), request.GET)
+        ordering = parse_ordering(request.GET.get('ordering'))
+    except (InvalidFilter, InvalidCursor) as e:
+        log_operation(f"用户数据API筛选参数错误: {str(e)}", request, level="WARNING")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    paginated = 'limit' in request.GET or 'cursor' in request.GET
+    if paginated:
+        try:
+            limit = parse_page_size(request.GET.get('limit'))
+            users, next_cursor = await akeyset_page(users, limit, request.GET.get('cursor'), ordering)
+        except InvalidCursor as e:
+            log_operation(f"用户数据API分页参数错误: {str(e)}", request, level="WARNING")
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+        log_operation(f"返回用户数据分页: 本页 {len(users)}, 是否有下一页 {next_cursor is not None}", request)
+    else:
+        user_count = await users.acount()
+        active_count = await users.filter(is_active=True).acount()
+        log_operation(f"返回用户数据: 总数 {user_count}, 激活 {active_count}", request)
+        users = users.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+        return streaming_json_response('users', user_rows(users), transform=serialize_user_row,
+                                       asynchronous=is_asgi_request(request))
+
     return JsonResponse({
-        'users': [
-            {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'group_name': user.groups.first().name if user.groups.exists() else None,
-                'is_active': user.is_active
-            }
-            for user in users
-        ]
+        'users': await aserialize_user_list(users),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
     })
+
+
+# 变更记录必须与用户数据来自同一个库，不使用只读副本
+@async_permission_required('auth.view_user', login_url='demo:login')
+async def changes_api(request):
+    """
+    仪表盘增量刷新API
+
+    请求方法: GET
+    请求参数:
+        - since (int): 客户端已同步到的版本号（页面渲染时下发的 changeVersion）
+
+    返回:
+        {'version': int, 'reset': bool, 'users': [...], 'groups': [...],
+         'deleted': {'users': [...], 'groups': [...]}, 'stats': {...}}
+        reset 为 true 时客户端应重新加载页面
+    """
+    try:
+        since = int(request.GET.get('since', ''))
+        if since < 0:
+            raise ValueError(since)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'since 必须是非负整数'}, status=400)
+    changes = await sync_to_async(collect_changes)(since)
+    log_operation(
+        f"增量刷新: since {since} -> {changes['version']}, 用户 {len(changes['users'])}, "
+        f"删除 {len(changes['deleted']['users'])}, reset {changes['reset']}",
+        request
+    )
+    return JsonResponse(changes)
+
+
+@async_permission_required('auth.view_user', login_url='demo:login')
+async def events(request):
+    """
+    实时事件推送（Server-Sent Events）
+
+    请求方法: GET
+    返回:
+        text/event-stream，事件类型为 user.created/user.updated/user.deleted/
+        group.created/group.updated/group.deleted，数据为 {'type', 'id', 'version'}
+
+    说明:
+        只在 ASGI 部署（SERVER_MODE=asgi）下提供；WSGI 工作线程无法长时间保持连接，
+        返回 204 使 EventSource 停止重连，页面退回到手动刷新。
+    """
+    if not is_asgi_request(request):
+        return HttpResponse(status=204)
+    user = await aresolve_user(request)
+    log_operation(f"用户 {user.username} 订阅实时事件", request)
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # 关闭反向代理（nginx）的响应缓冲
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,6 +4,8 @@
 if [ "$DJANGO_SETTINGS_MODULE" = "DjangoProject.settings_production" ] || [ "$DEBUG" = "False" ]; then
     echo "生产环境模式"
     export DJANGO_SETTINGS_MODULE=DjangoProject.settings_production
+    # 导出工作进程数，settings 据此均分每个进程的密码哈希进程池
+    export GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
 
     # 执行数据库迁移
     echo "执行数据库迁移..."
@@ -13,11 +15,26 @@ if [ "$DJANGO_SETTINGS_MODULE" = "DjangoProject.settings_production" ] || [ "$DE
     echo "收集静态文件..."
     python manage.py collectstatic --noinput --clear || true
 
+    # SERVER_MODE=asgi 时使用 uvicorn worker 运行异步视图，否则使用线程化的WSGI worker
+    if [ "$SERVER_MODE" = "asgi" ]; then
+        echo "启动 Gunicorn 服务器（ASGI / uvicorn）..."
+        exec gunicorn DjangoProject.asgi:application \
+            --bind 0.0.0.0:8000 \
+            --workers ${GUNICORN_WORKERS:-4} \
+            --worker-class uvicorn_worker.UvicornWorker \
+            --env DJANGO_SETTINGS_MODULE=DjangoProject.settings_production \
+            --log-level=info \
+            --access-logfile=- \
+            --error-logfile=-
+    fi
+
     # 启动 Gunicorn（生产环境）
     echo "启动 Gunicorn 服务器..."
     exec gunicorn DjangoProject.wsgi:application \
         --bind 0.0.0.0:8000 \
-        --workers 4 \
+        --workers ${GUNICORN_WORKERS:-4} \
+        --worker-class gthread \
+        --threads ${GUNICORN_THREADS:-4} \
         --env DJANGO_SETTINGS_MODULE=DjangoProject.settings_production \
         --log-level=info \
         --access-logfile=- \